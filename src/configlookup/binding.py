@@ -0,0 +1,162 @@
+import dataclasses
+import logging
+import typing
+from typing import Any, Callable, Dict, List, Tuple, Type, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# sentinel for "not found" in the getter, as None is a legit value
+NOT_FOUND = object()
+
+
+class ConfigurationBinder:
+    """
+    builds instances of user declared classes, dataclasses or classes with __slots__, out of a configuration section,
+    every field is filled with the value of the key named after it in the section, converted to the field type hint,
+    as in:
+        @dataclass
+        class ResourcesCfg:
+            mem: int
+            color: str = "yellow"
+
+        filled with "server.resources.mem" and "server.resources.color"
+    """
+
+    TRUE_VALUES = ("true", "yes", "on", "1")
+    FALSE_VALUES = ("false", "no", "off", "0")
+
+    @staticmethod
+    def build(cls: Type[T], prefix: str, get: Callable[[str], Any]) -> T:
+        """
+        builds an instance of cls with the values of the configuration section
+
+        Parameters
+        ----------
+        cls : Type[T]
+            a dataclass or a class with __slots__, whose type hints define the fields conversion,
+            fields typed with another such class are built from the nested section
+        prefix : str
+            the configuration section, in property format, as in "server.resources"
+        get : Callable[[str], Any]
+            function getting a configuration value by key, in property format, or NOT_FOUND
+
+        Returns
+        -------
+        T
+            the instance
+
+        Raises
+        ------
+        TypeError
+            if cls is neither a dataclass nor a class with __slots__
+        LookupError
+            if a field without default is not found in the section
+        ValueError
+            if a value can't be converted to its field type
+        """
+        log.debug(f"[ConfigurationBinder.build|in] ({cls}, {prefix})")
+        values = {}
+        for name, hint, default in ConfigurationBinder.__fields(cls):
+            key = f"{prefix}.{name.lower()}" if prefix else name.lower()
+            if ConfigurationBinder.__is_bindable(hint):
+                values[name] = ConfigurationBinder.build(hint, key, get)
+                continue
+            value = get(key)
+            if value is NOT_FOUND:
+                if default is NOT_FOUND:
+                    raise LookupError(f"[ConfigurationBinder.build] key {key} not found")
+                values[name] = default
+            else:
+                values[name] = ConfigurationBinder.coerce(value, hint, key)
+
+        if dataclasses.is_dataclass(cls):
+            result = cls(**values)
+        else:
+            result = cls.__new__(cls)
+            for name, value in values.items():
+                setattr(result, name, value)
+        log.debug(f"[ConfigurationBinder.build|out] => {result}")
+        return result
+
+    @staticmethod
+    def coerce(value: Any, hint: Any, key: str = "") -> Any:
+        """
+        converts a configuration value, that might come as text from overriders, to a type hint
+
+        Parameters
+        ----------
+        value : Any
+            the value
+        hint : Any
+            the type hint, as in int, Optional[float] or List[int]
+        key : str
+            the key of the value, for error messages
+
+        Returns
+        -------
+            the converted value
+
+        Raises
+        ------
+        ValueError
+            if the value can't be converted
+        """
+        origin = getattr(hint, "__origin__", None)
+        args = getattr(hint, "__args__", None) or ()
+        try:
+            if hint is Any or hint is None:
+                return value
+            if origin is typing.Union:
+                if value is None and type(None) in args:
+                    return None
+                return ConfigurationBinder.coerce(value, next(a for a in args if a is not type(None)), key)
+            if origin in (list, List):
+                return [ConfigurationBinder.coerce(v, args[0], key) for v in value] if args else list(value)
+            if origin in (tuple, Tuple):
+                return tuple(value)
+            if origin in (dict, Dict):
+                return dict(value)
+            if hint is bool and isinstance(value, str):
+                if value.lower() in ConfigurationBinder.TRUE_VALUES:
+                    return True
+                if value.lower() in ConfigurationBinder.FALSE_VALUES:
+                    return False
+                raise ValueError(value)
+            if isinstance(hint, type):
+                return value if type(value) is hint else hint(value)
+            return value
+        except (TypeError, ValueError) as x:
+            raise ValueError(f"[ConfigurationBinder.coerce] {key}: can't convert {value!r} to {hint}") from x
+
+    @staticmethod
+    def __fields(cls: type) -> List[Tuple[str, Any, Any]]:
+        """(name, type hint, default or NOT_FOUND) of every field"""
+        hints = typing.get_type_hints(cls)
+        if dataclasses.is_dataclass(cls):
+            result = []
+            for field in dataclasses.fields(cls):
+                if not field.init:
+                    continue
+                default = NOT_FOUND
+                if field.default is not dataclasses.MISSING:
+                    default = field.default
+                elif field.default_factory is not dataclasses.MISSING:
+                    default = field.default_factory()
+                result.append((field.name, hints.get(field.name, Any), default))
+            return result
+
+        slots = []
+        for klass in reversed(cls.__mro__):
+            declared = klass.__dict__.get("__slots__", ())
+            for slot in [declared] if isinstance(declared, str) else declared:
+                if slot not in ("__dict__", "__weakref__"):
+                    slots.append(slot)
+        if not slots:
+            raise TypeError(f"[ConfigurationBinder] {cls} is neither a dataclass nor a class with __slots__")
+        return [(slot, hints.get(slot, Any), NOT_FOUND) for slot in slots]
+
+    @staticmethod
+    def __is_bindable(hint: Any) -> bool:
+        return isinstance(hint, type) and (dataclasses.is_dataclass(hint) or "__slots__" in hint.__dict__)
@@ -0,0 +1,419 @@
+import logging
+import re
+from bisect import bisect_left
+from collections import ChainMap
+from heapq import merge
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from configlookup.utils import ConfigurationUtils
+
+log = logging.getLogger(__name__)
+
+
+class ConfigurationIndex:
+    """
+    flat lookup index over the merged configuration dict, built once at load time,
+    maps every property key in format "a.b.c" to its value, list elements included, as in "a.b[2].c",
+    so that a lookup is a single dict access instead of a descent through the nested structure,
+    and the key set doubles as a fast miss check.
+    keeps the properties in sorted arrays too, so that prefix and glob queries are a binary search
+    plus a scan over the matching range only.
+    patched indexes keep their changes in layers on top of the ones they were patched from, see patched
+    """
+
+    WILDCARD_CHARS = "*?"
+    # sorts after any char we might find in a key, used to bound prefix ranges
+    MAX_CHAR = "\U0010ffff"
+
+    def __init__(self, data: Dict[str, Any], owned: Optional[Set[int]] = None):
+        """
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            the merged configuration dict, as built by ConfigurationUtils.merge_dict
+        owned : Optional[Set[int]]
+            ids of the dicts in data that can be changed in place, when it shares others with another configuration,
+            see ConfigurationUtils.share_dict, default: all of them
+        """
+        log.debug("[__init__|in]")
+        self.__data = data
+        self.__properties: Dict[str, Any] = {}
+        # the keys path to every property value in the nested structure
+        self.__paths: Dict[str, Tuple[Union[str, int], ...]] = {}
+        # first level properties => key in the configuration dict
+        self.__roots: Dict[str, str] = {}
+        # list element properties with indexes as sub keys => properties, as in "a.2.c" => "a[2].c",
+        # the way they come from variables and json pointers
+        self.__aliases: Dict[str, str] = {}
+        # ids of the dicts we can change in place, None for all of them, see patched
+        self.__owned = owned
+        self.__build(data)
+        # layers of sorted properties, see patched
+        self.__sorted = [sorted(self.__properties)]
+        log.debug(f"[__init__|out] => {len(self.__properties)} properties")
+
+    def __build(self, data: Dict[str, Any]):
+        # merge_dict adds a flattened upper case variable ("A__B__C") to the root for every nested scalar,
+        # we don't want those as properties, so root keys with upper case chars are only indexed
+        # when they don't shadow a property already found in the nested structure, and in property format,
+        # as in "A__B__C" => "a.b.c", the way they are asked for
+        deferred = []
+        for key, value in data.items():
+            if key != key.lower():
+                deferred.append(key)
+            else:
+                self.__roots[key] = key
+                self.__add(key, (key,), value)
+
+        for key in deferred:
+            prop = ConfigurationUtils.variable_to_property(key)
+            if prop not in self.__properties and prop not in self.__aliases:
+                self.__roots[prop] = key
+                self.__add(prop, (key,), data[key])
+
+    def __add(self, prop: str, path: Tuple[Union[str, int], ...], value: Any, alias: Optional[str] = None):
+        self.__properties[prop] = value
+        self.__paths[prop] = path
+        if alias is not None:
+            self.__aliases[alias] = prop
+        if isinstance(value, dict):
+            for key, child in value.items():
+                self.__add(
+                    f"{prop}.{key.lower()}", path + (key,), child, None if alias is None else f"{alias}.{key.lower()}"
+                )
+        elif isinstance(value, list):
+            for index, child in enumerate(value):
+                self.__add(f"{prop}[{index}]", path + (index,), child, f"{prop if alias is None else alias}.{index}")
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """the indexed configuration dict"""
+        return self.__data
+
+    def set(self, prop: str, value: Any):
+        """
+        sets the value of an indexed property, in the index and in the configuration dict,
+        together with its flattened variable if there is one
+
+        Parameters
+        ----------
+        prop : str
+            the indexed property, in format "a.b.c", not within a list, see within_list
+        value : Any
+            the new value
+
+        Raises
+        ------
+        KeyError
+            if the property is not indexed
+        """
+        path = self.__paths[prop]
+        parent = self.__data
+        for depth, key in enumerate(path[:-1]):
+            child = parent[key]
+            if self.__owned is not None and id(child) not in self.__owned:
+                # shared with the configuration we were patched from, copy on write
+                child = dict(child)
+                parent[key] = child
+                self.__owned.add(id(child))
+                self.__properties[".".join(prop.split(sep=".")[: depth + 1])] = child
+            parent = child
+        parent[path[-1]] = value
+        self.__properties[prop] = value
+        var = ConfigurationUtils.property_to_variable(prop)
+        if var in self.__data and not isinstance(self.__data[var], dict):
+            self.__data[var] = value
+
+    def patched(self, patch: Dict[str, Any]) -> Tuple["ConfigurationIndex", List[str]]:
+        """
+        merges a patch into a copy of the configuration, with the same semantics as ConfigurationUtils.merge_dict,
+        leaving this index and its configuration untouched.
+        only the dicts along the patched paths are copied, everything else is shared with this configuration,
+        and the index takes the patched properties as a layer on top of the ones of this index, see __stack,
+        so that patching costs in proportion to the patch, but for a copy of the references in the root dict
+
+        Parameters
+        ----------
+        patch : Dict[str, Any]
+            the partial configuration to merge
+
+        Returns
+        -------
+        Tuple[ConfigurationIndex, List[str]]
+            the index of the patched configuration and the patched properties whose value changed,
+            for dicts only the ones added
+
+        Raises
+        ------
+        TypeError
+            when key types do not match across the configuration and the patch,
+            a section, dict or list, can't be replaced by a value either, as its keys would be left indexed
+        """
+        log.debug(f"[patched|in] ({patch})")
+        result = ConfigurationIndex.__new__(ConfigurationIndex)
+        # readers need a dict, so the root one can't be layered
+        result.__data = dict(self.__data)
+        result.__owned = {id(result.__data)}
+        # changes go to the first layer
+        result.__properties = ChainMap({}, self.__properties)
+        result.__paths = ChainMap({}, self.__paths)
+        result.__roots = ChainMap({}, self.__roots)
+        result.__aliases = ChainMap({}, self.__aliases)
+        added: List[str] = []
+        changed: List[str] = []
+        result.__merge(self, patch, result.__data, (), None, added, changed)
+
+        result.__properties = ConfigurationIndex.__stack(result.__properties)
+        result.__paths = ConfigurationIndex.__stack(result.__paths)
+        result.__roots = ConfigurationIndex.__stack(result.__roots)
+        result.__aliases = ConfigurationIndex.__stack(result.__aliases)
+        result.__sorted = ConfigurationIndex.__stack_sorted(sorted(added), self.__sorted)
+        log.debug(f"[patched|out] => {changed}")
+        return result, changed
+
+    @staticmethod
+    def __stack(layers: ChainMap) -> Union[ChainMap, Dict[str, Any]]:
+        """
+        merges the first layer with the next one while it is at least half as big, so that there are
+        logarithmically many layers and every entry is copied logarithmically many times,
+        the first layer is always a new dict, the one changes are written to
+        """
+        maps = list(layers.maps)
+        if len(maps) > 1 and isinstance(maps[1], ChainMap):
+            maps[1:] = maps[1].maps
+        while len(maps) > 1 and 2 * len(maps[0]) >= len(maps[1]):
+            merged = dict(maps[1])
+            merged.update(maps[0])
+            maps[:2] = [merged]
+        return maps[0] if len(maps) == 1 else ChainMap(*maps)
+
+    @staticmethod
+    def __stack_sorted(added: List[str], layers: List[List[str]]) -> List[List[str]]:
+        """same as __stack for the sorted properties, layers of sorted lists with no property in more than one"""
+        result = [added] + layers
+        while len(result) > 1 and 2 * len(result[0]) >= len(result[1]):
+            result[:2] = [list(merge(result[1], result[0]))]
+        return result
+
+    def __merge(
+        self,
+        previous: "ConfigurationIndex",
+        patch: Dict[str, Any],
+        target: Dict[str, Any],
+        path: Tuple[str, ...],
+        prop: Optional[str],
+        added: List[str],
+        changed: List[str],
+    ):
+        # merges as ConfigurationUtils.merge_dict does, but only along the patch, copying dicts and lists on write,
+        # and indexes the patched properties
+        for key, patch_value in patch.items():
+            child_path = path + (key,)
+            if type(patch_value) is dict:
+                if key not in target:
+                    target[key] = {}
+                elif type(target[key]) is not dict:
+                    raise TypeError(f"key: {key} type does not match")
+                elif id(target[key]) not in self.__owned:
+                    target[key] = dict(target[key])
+                self.__owned.add(id(target[key]))
+            elif type(patch_value) is list:
+                if key in target and type(target[key]) is not list:
+                    raise TypeError(f"key: {key} type does not match")
+                target[key] = ConfigurationUtils.unique(target.get(key, []) + patch_value)
+                if prop is not None:
+                    self.__data["__".join(child_path).upper()] = target[key]
+            else:
+                if key in target and type(target[key]) in (dict, list):
+                    raise TypeError(f"key: {key} type does not match")
+                target[key] = patch_value
+                self.__data["__".join(child_path).upper()] = patch_value
+            value = target[key]
+
+            if prop is None:
+                child_prop = key.lower()
+                if key != key.lower():
+                    # flattened variables, indexed as in __build
+                    child_prop = ConfigurationUtils.variable_to_property(key)
+                    if child_prop in self.__aliases or (
+                        child_prop in self.__properties and self.__paths[child_prop] != (key,)
+                    ):
+                        continue
+                self.__roots[child_prop] = key
+            else:
+                child_prop = f"{prop}.{key.lower()}"
+
+            is_added = self.__put(previous, child_prop, child_path, value, added)
+            if isinstance(value, dict):
+                if is_added:
+                    changed.append(child_prop)
+                self.__merge(previous, patch_value, value, child_path, child_prop, added, changed)
+            else:
+                old_value = previous.__properties.get(child_prop)
+                if is_added or type(old_value) is not type(value) or old_value != value:
+                    changed.append(child_prop)
+                if isinstance(value, list):
+                    self.__reindex_elements(previous, value, child_path, child_prop, child_prop, added, changed)
+
+    def __reindex_elements(
+        self,
+        previous: "ConfigurationIndex",
+        value: Any,
+        path: Tuple[Union[str, int], ...],
+        prop: str,
+        alias: str,
+        added: List[str],
+        changed: List[str],
+    ):
+        # lists are merged as a whole, so their elements, and whatever is in them, are indexed again
+        if isinstance(value, dict):
+            children = [(f"{prop}.{k.lower()}", f"{alias}.{k.lower()}", k, v) for k, v in value.items()]
+        elif isinstance(value, list):
+            children = [(f"{prop}[{i}]", f"{alias}.{i}", i, v) for i, v in enumerate(value)]
+        else:
+            return
+        for child_prop, child_alias, key, child in children:
+            is_added = self.__put(previous, child_prop, path + (key,), child, added)
+            self.__aliases[child_alias] = child_prop
+            old_value = previous.__properties.get(child_prop)
+            if is_added or (
+                not isinstance(child, (dict, list)) and (type(old_value) is not type(child) or old_value != child)
+            ):
+                changed.append(child_prop)
+            self.__reindex_elements(previous, child, path + (key,), child_prop, child_alias, added, changed)
+
+    def __put(
+        self,
+        previous: "ConfigurationIndex",
+        prop: str,
+        path: Tuple[Union[str, int], ...],
+        value: Any,
+        added: List[str],
+    ) -> bool:
+        """indexes a property, returns whether it was not indexed in previous, adding it to added then"""
+        result = prop not in previous.__properties
+        self.__properties[prop] = value
+        self.__paths[prop] = path
+        if result:
+            added.append(prop)
+        return result
+
+    def find(self, prop: str) -> Optional[str]:
+        """
+        finds the indexed property a key resolves to, following the same rules as ConfigurationUtils.find_property,
+        where sub keys not found at some level are skipped, as in "server.name_prefix" resolving to "name_prefix"
+        when there is no such entry in "server"
+
+        Parameters
+        ----------
+        prop : str
+            the key to search for, in format "a.b.c"
+
+        Returns
+        -------
+        Optional[str]
+            the indexed property or None if not found
+        """
+        if prop in self.__properties:
+            return prop
+        alias = self.__aliases.get(prop)
+        if alias is not None:
+            return alias
+        return self.__find(prop.split(sep="."), None)
+
+    def __find(self, components: List[str], parent: Optional[str]) -> Optional[str]:
+        result = None
+        for index, subkey in enumerate(components):
+            candidate = subkey if parent is None else f"{parent}.{subkey}"
+            if candidate in self.__properties:
+                if index + 1 == len(components):
+                    result = candidate
+                elif isinstance(self.__properties[candidate], dict):
+                    result = self.__find(components[index + 1 :], candidate)
+                if result:
+                    break
+        return result
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """
+        finds the properties under a prefix, or matching a glob pattern if it contains wildcards,
+        where '*' matches any sequence of chars, dots included, and '?' any single char
+
+        Parameters
+        ----------
+        prefix : str
+            property prefix, as in "server.pools", or glob pattern, as in "server.*.url",
+            the empty prefix stands for every property
+
+        Returns
+        -------
+        List[str]
+            the sorted list of properties under the prefix, the prefix itself not included,
+            or matching the pattern
+        """
+        log.debug(f"[keys|in] ({prefix})")
+        wildcard = next((i for i, c in enumerate(prefix) if c in ConfigurationIndex.WILDCARD_CHARS), None)
+        if wildcard is None:
+            if prefix:
+                prefix = self.__aliases.get(prefix.rstrip("."), prefix.rstrip("."))
+                # the children in a dict and the elements in a list
+                result = self.__range(prefix + ".") + self.__range(prefix + "[")
+            else:
+                result = self.__range(prefix)
+        else:
+            # only scan the range sharing the literal head of the pattern
+            pattern = re.compile(
+                re.escape(prefix).replace("\\*", ".*").replace("\\?", ".") + "$",
+                re.DOTALL,
+            )
+            result = [k for k in self.__range(prefix[:wildcard]) if pattern.match(k)]
+        log.debug(f"[keys|out] => {result}")
+        return result
+
+    def __range(self, prefix: str) -> List[str]:
+        ranges = []
+        for layer in self.__sorted:
+            start = bisect_left(layer, prefix)
+            end = bisect_left(layer, prefix + ConfigurationIndex.MAX_CHAR, start)
+            if start < end:
+                ranges.append(layer[start:end])
+        return ranges[0] if len(ranges) == 1 else list(merge(*ranges))
+
+    def diff(self, other: "ConfigurationIndex") -> List[str]:
+        """
+        finds the properties whose values differ between another index, of a previous configuration, and this one
+
+        Parameters
+        ----------
+        other : ConfigurationIndex
+            the index of the configuration to compare with
+
+        Returns
+        -------
+        List[str]
+            the changed properties, see ConfigurationUtils.diff
+        """
+        result = []
+        for prop in self.__roots.keys() | other.__roots.keys():
+            if prop not in other.__roots or prop not in self.__roots:
+                result.append(prop)
+            else:
+                old, new = other.__data[other.__roots[prop]], self.__data[self.__roots[prop]]
+                result.extend(ConfigurationUtils.diff(old, new, prop))
+        return sorted(result)
+
+    def within_list(self, prop: str) -> bool:
+        """whether an indexed property is a list element or within one"""
+        return any(isinstance(key, int) for key in self.__paths[prop])
+
+    def __contains__(self, prop: str) -> bool:
+        return prop in self.__properties
+
+    def __getitem__(self, prop: str) -> Any:
+        return self.__properties[prop]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__properties)
+
+    def __len__(self) -> int:
+        return len(self.__properties)
@@ -0,0 +1,303 @@
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from configlookup.index import ConfigurationIndex
+from configlookup.utils import ConfigurationUtils
+
+log = logging.getLogger(__name__)
+
+
+class ConfigurationInterpolator:
+    """
+    resolves "${other.key}" references in configuration text values, once, at load time,
+    following the references dependency order and writing the resolved values back into the configuration.
+    references can be in property or env var format, "$${" escapes a literal "${",
+    and a value made of a single reference takes the referenced value as is, not its text.
+    references are to values, not to sections, dicts or lists, nor to the sections containing the template
+
+    values depending on overridable variables are rendered again, with the overrides, only when
+    those overrides change, see 'value'
+    """
+
+    REFERENCE_PATTERN = re.compile(r"\$(\$)?\{([^}]*)\}")
+
+    def __init__(self, data: Dict[str, Any], index: ConfigurationIndex):
+        """
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            the merged configuration dict, as built by ConfigurationUtils.merge_dict
+        index : ConfigurationIndex
+            the index of the configuration dict, resolved values are written through it
+
+        Raises
+        ------
+        ValueError
+            if a reference is not found in the configuration, is to a section, a dict or a list,
+            or references are circular
+        """
+        log.debug("[__init__|in]")
+        self.__data = data
+        self.__index = index
+        # property => template text
+        self.__templates: Dict[str, str] = {}
+        # property => referenced properties
+        self.__references: Dict[str, List[str]] = {}
+        # property => templates referencing it
+        self.__referrers: Dict[str, Set[str]] = {}
+        # properties whose referrers set can be changed in place, None for all of them, see patched
+        self.__owned: Optional[Set[str]] = None
+        # property => overridable variables it depends on, transitively
+        self.__variables: Dict[str, Tuple[str, ...]] = {}
+        # property => (overrides, rendered value), last rendering with overrides
+        self.__rendered: Dict[str, Tuple[Tuple[Any, ...], Any]] = {}
+
+        self.__update([prop for prop in index if isinstance(index[prop], str)])
+        log.debug(f"[__init__|out] => {len(self.__templates)} templates")
+
+    def patched(self, index: ConfigurationIndex, changed: List[str]) -> Tuple["ConfigurationInterpolator", List[str]]:
+        """
+        resolves references on a patched configuration, leaving this interpolator untouched,
+        only the changed properties, and the ones depending on them, are resolved again,
+        the templates bookkeeping is copied, by reference, so it costs in proportion to the number of templates
+
+        Parameters
+        ----------
+        index : ConfigurationIndex
+            the index of the patched configuration, see ConfigurationIndex.patched
+        changed : List[str]
+            the patched properties
+
+        Returns
+        -------
+        Tuple[ConfigurationInterpolator, List[str]]
+            the interpolator of the patched configuration and the properties resolved again
+
+        Raises
+        ------
+        ValueError
+            if a reference is not found in the configuration, is to a section, or references are circular
+        """
+        log.debug(f"[patched|in] ({changed})")
+        result = ConfigurationInterpolator.__new__(ConfigurationInterpolator)
+        result.__data = index.data
+        result.__index = index
+        result.__templates = dict(self.__templates)
+        result.__references = dict(self.__references)
+        # referrers sets are shared, copied on write
+        result.__referrers = dict(self.__referrers)
+        result.__owned = set()
+        result.__variables = dict(self.__variables)
+        result.__rendered = {}
+        resolved = result.__update(changed)
+        log.debug(f"[patched|out] => {resolved}")
+        return result, resolved
+
+    def __update(self, props: List[str]) -> List[str]:
+        """takes in the new values of properties, resolving them and whatever depends on them"""
+        dirty = set()
+        for prop in props:
+            for reference in self.__references.pop(prop, ()):
+                self.__referrers_of(reference).discard(prop)
+            self.__templates.pop(prop, None)
+            self.__variables.pop(prop, None)
+            value = self.__index[prop]
+            # values within lists are taken as they are, lists are merged as a whole
+            if isinstance(value, str) and "${" in value and not self.__index.within_list(prop):
+                self.__templates[prop] = value
+                dirty.add(prop)
+        for prop in dirty:
+            self.__references[prop] = self.__parse(prop, self.__templates[prop])
+            for reference in self.__references[prop]:
+                self.__referrers_of(reference).add(prop)
+
+        # whatever references what changed, or the dicts containing it, must be resolved again
+        pending = list({".".join(c[:i]) for c in (p.split(sep=".") for p in props) for i in range(1, len(c) + 1)})
+        while pending:
+            for referrer in self.__referrers.get(pending.pop(), ()):
+                if referrer not in dirty:
+                    dirty.add(referrer)
+                    pending.append(referrer)
+
+        result = self.__sort(dirty)
+        for prop in result:
+            self.__variables[prop] = self.__collect_variables(prop)
+            # referenced templates come first, so they are already resolved in the index
+            self.__index.set(prop, self.__render(prop, lambda var: None, {}))
+        return result
+
+    def __referrers_of(self, prop: str) -> Set[str]:
+        """the referrers of a property, to be changed"""
+        result = self.__referrers.get(prop)
+        if result is None or (self.__owned is not None and prop not in self.__owned):
+            result = set() if result is None else set(result)
+            self.__referrers[prop] = result
+            if self.__owned is not None:
+                self.__owned.add(prop)
+        return result
+
+    def __parse(self, prop: str, template: str) -> List[str]:
+        result = []
+        for match in ConfigurationInterpolator.REFERENCE_PATTERN.finditer(template):
+            if match.group(1):
+                continue
+            reference = self.__index.find(ConfigurationUtils.prop_and_var_from_key(match.group(2).strip())[0])
+            if reference is None:
+                raise ValueError(f"[__parse] {prop} references a key not found: {match.group(2)}")
+            if reference == prop or prop.startswith(f"{reference}.") or prop.startswith(f"{reference}["):
+                # the value would end up containing itself
+                raise ValueError(f"[__parse] circular reference: {prop} -> {reference}")
+            if isinstance(self.__index[reference], (dict, list)):
+                # the rendered value would be a copy of the section with none of its keys indexed
+                raise ValueError(f"[__parse] {prop} references a section, not a value: {match.group(2)}")
+            if reference not in result:
+                result.append(reference)
+        return result
+
+    def __sort(self, props: Set[str]) -> List[str]:
+        """topological sort of templates, referenced ones first"""
+        result = []
+        # property => True while visiting its references, False when done
+        state: Dict[str, bool] = {}
+
+        for root in sorted(props):
+            if root in state:
+                continue
+            state[root] = True
+            # depth first, with the references left to visit of every property in the path
+            stack = [(root, iter(self.__references[root]))]
+            while stack:
+                prop, references = stack[-1]
+                for reference in references:
+                    if reference not in props or state.get(reference) is False:
+                        continue
+                    if state.get(reference) is True:
+                        path = [p for p, _ in stack]
+                        cycle = path[path.index(reference) :] + [reference]
+                        raise ValueError(f"[__sort] circular reference: {' -> '.join(cycle)}")
+                    state[reference] = True
+                    stack.append((reference, iter(self.__references[reference])))
+                    break
+                else:
+                    stack.pop()
+                    state[prop] = False
+                    result.append(prop)
+        return result
+
+    def __collect_variables(self, prop: str) -> Tuple[str, ...]:
+        # references come resolved first, so theirs are already collected
+        result: Dict[str, None] = {}
+        for reference in self.__references[prop]:
+            var = ConfigurationUtils.property_to_variable(reference)
+            if var in self.__data:
+                result[var] = None
+            result.update(dict.fromkeys(self.__variables.get(reference, ())))
+        return tuple(result)
+
+    def __render(self, prop: str, overridden: Callable[[str], Optional[Any]], rendered: Dict[str, Any]) -> Any:
+        """renders a template, taking references from rendered, when there, or from the index, as already resolved"""
+        template = self.__templates[prop]
+
+        def resolve(reference: str) -> Any:
+            var = ConfigurationUtils.property_to_variable(reference)
+            result = overridden(var) if var in self.__data else None
+            if result is None:
+                result = rendered[reference] if reference in rendered else self.__index[reference]
+            return result
+
+        def resolve_key(key: str) -> Any:
+            return resolve(self.__index.find(ConfigurationUtils.prop_and_var_from_key(key)[0]))
+
+        return ConfigurationInterpolator.render_text(template, resolve_key)
+
+    def __contains__(self, prop: str) -> bool:
+        return prop in self.__templates
+
+    @staticmethod
+    def render_text(template: str, resolve: Callable[[str], Any]) -> Any:
+        """
+        renders a template, "$${" escapes included
+
+        Parameters
+        ----------
+        template : str
+            the template text
+        resolve : Callable[[str], Any]
+            function resolving a reference, as written in the template, to its value
+
+        Returns
+        -------
+            the rendered text, or the referenced value as is for a template made of a single reference
+        """
+        match = ConfigurationInterpolator.REFERENCE_PATTERN.fullmatch(template)
+        if match and not match.group(1):
+            return resolve(match.group(2).strip())
+
+        def replace(match: re.Match) -> str:
+            if match.group(1):
+                return match.group(0)[1:]
+            return str(resolve(match.group(2).strip()))
+
+        return ConfigurationInterpolator.REFERENCE_PATTERN.sub(replace, template)
+
+    @property
+    def templates(self) -> Dict[str, str]:
+        """the interpolated properties and their original text"""
+        return dict(self.__templates)
+
+    def dependents(self, variables: Iterable[str]) -> Set[str]:
+        """
+        finds the interpolated properties depending on any of the variables
+
+        Parameters
+        ----------
+        variables : Iterable[str]
+            the variables, in env var format
+
+        Returns
+        -------
+        Set[str]
+            the interpolated properties
+        """
+        variables = set(variables)
+        return {prop for prop, dependencies in self.__variables.items() if not variables.isdisjoint(dependencies)}
+
+    def value(self, prop: str, overridden: Callable[[str], Optional[Any]]) -> Any:
+        """
+        gets the value of an interpolated property taking into account the overrides of the variables it depends on,
+        it is only rendered again when those overrides change
+
+        Parameters
+        ----------
+        prop : str
+            the interpolated property
+        overridden : Callable[[str], Optional[Any]]
+            function providing the overridden value of a variable, or None if not overridden
+
+        Returns
+        -------
+            the interpolated value
+        """
+        overrides = tuple(overridden(var) for var in self.__variables[prop])
+        if not any(o is not None for o in overrides):
+            return self.__index[prop]
+        rendered = self.__rendered.get(prop)
+        if rendered is None or rendered[0] != overrides:
+            log.debug(f"[value] rendering {prop} with overrides")
+            rendered = (overrides, self.__render_overridden(prop, overridden))
+            self.__rendered[prop] = rendered
+        return rendered[1]
+
+    def __render_overridden(self, prop: str, overridden: Callable[[str], Optional[Any]]) -> Any:
+        # the templates it depends on that depend on overridable variables too, have to be rendered again, once each
+        pending, dependencies = [prop], {prop}
+        while pending:
+            for reference in self.__references[pending.pop()]:
+                if reference not in dependencies and self.__variables.get(reference):
+                    dependencies.add(reference)
+                    pending.append(reference)
+        rendered: Dict[str, Any] = {}
+        for template in self.__sort(dependencies):
+            rendered[template] = self.__render(template, overridden, rendered)
+        return rendered[prop]
@@ -1,14 +1,107 @@
+import atexit
+import json
 import logging
 import os
-from typing import List, Optional
+import pickle
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
 
+from configlookup.binding import NOT_FOUND, ConfigurationBinder
+from configlookup.index import ConfigurationIndex
+from configlookup.interpolation import ConfigurationInterpolator
+from configlookup.overrider.abstract_overrider import AbstractOverrider
+from configlookup.overrider.dict_overrider import DictOverrider
 from configlookup.overrider.environment_overrider import EnvironmentOverrider
-from configlookup.reader import FileSysConfigurationReader
+from configlookup.overrider.overrider_chain import OverriderChain
+from configlookup.reader import ConfigurationReader, FileSysConfigurationReader
 from configlookup.singleton import SingletonMeta
+from configlookup.state import ConfigurationState
 from configlookup.utils import ConfigurationUtils
 
 log = logging.getLogger(__name__)
 
+# sentinel for "no default provided" in get, as None is a legit default
+_NO_DEFAULT = object()
+
+T = TypeVar("T")
+
+
+class ConfigurationView:
+    """
+    read only configuration of an environment, see Configuration.view
+    """
+
+    __slots__ = ("__state", "__lookup")
+
+    def __init__(self, state: ConfigurationState, lookup: Callable[[ConfigurationState, str, Any], Any]):
+        self.__state = state
+        self.__lookup = lookup
+
+    def get(self, key: str, default: Any = _NO_DEFAULT):
+        """
+        get the configuration value, see Configuration.get
+        """
+        return self.__lookup(self.__state, key, default)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """
+        get the configuration keys under a prefix, see Configuration.keys
+        """
+        return self.__state.index.keys(ConfigurationUtils.prop_and_var_from_key(prefix)[0])
+
+    def items(self, prefix: str = "") -> List[Tuple[str, Any]]:
+        """
+        get the configuration entries under a prefix, see Configuration.items
+        """
+        return [(k, self.__lookup(self.__state, k, _NO_DEFAULT)) for k in self.keys(prefix)]
+
+
+class ConfigurationHandle:
+    """
+    accessor of a configuration value, resolved once, overrides included, and kept until the configuration
+    changes, on load, patch or overrides refresh, when it is resolved again, see Configuration.handle
+    """
+
+    __slots__ = ("key", "__resolve", "__version", "__cached")
+
+    def __init__(self, key: str, resolve: Callable[[], Any], version: List[int]):
+        """
+        Parameters
+        ----------
+        key : str
+            the configuration key
+        resolve : Callable[[], Any]
+            function resolving the value
+        version : List[int]
+            single element list with the configuration version, increased on every change
+        """
+        self.key = key
+        self.__resolve = resolve
+        self.__version = version
+        # (version, value), so that both are always read together
+        self.__cached = (version[0], resolve())
+
+    def __call__(self) -> Any:
+        """
+        Returns
+        -------
+            the current configuration value
+
+        Raises
+        ------
+        LookupError
+            if the key is not found anymore
+        """
+        cached = self.__cached
+        if cached[0] != self.__version[0]:
+            version = self.__version[0]
+            cached = (version, self.__resolve())
+            self.__cached = cached
+        return cached[1]
+
+    def __repr__(self) -> str:
+        return f"ConfigurationHandle({self.key})"
+
 
 class Configuration(metaclass=SingletonMeta):
 
@@ -20,6 +113,10 @@ class Configuration(metaclass=SingletonMeta):
     DEFAULT_CONFIGURATION_FILE_SUFFIXES = ["", "_all", "_local"]
     VAR_CONFIGURATION_ENV = "CONFIGLOOKUP_ENV"
     DEFAULT_CONFIGURATION_ENV = "dev"
+    VAR_CONFIGURATION_SNAPSHOT_FD = "CONFIGLOOKUP_SNAPSHOT_FD"
+    VAR_CONFIGURATION_HOT_KEYS_FILE = "CONFIGLOOKUP_HOT_KEYS_FILE"
+    MISSING_KEYS_CACHE_SIZE = 1024
+    SNAPSHOT_VERSION = 1
 
     def __init__(
         self,
@@ -28,6 +125,9 @@ class Configuration(metaclass=SingletonMeta):
         files_additional_suffixes: Optional[List[str]] = None,
         files: Optional[List[str]] = None,
         environment: Optional[str] = None,
+        reader: Optional[ConfigurationReader] = None,
+        snapshot: Optional[bytes] = None,
+        hot_keys_file: Optional[str] = None,
     ):
         """
         Parameters
@@ -49,6 +149,14 @@ class Configuration(metaclass=SingletonMeta):
                 "dev": {...},
                 "prod": {...}
             }
+        reader : Optional[ConfigurationReader]
+            instead of config files we can provide a reader of another source, an HttpConfigurationReader
+            as an example, already set up with the entries to filter, all the other parameters are then ignored
+        snapshot : Optional[bytes]
+            instead of reading config from its sources we can load a snapshot exported by another instance,
+            see export_snapshot, all the other parameters are then ignored
+        hot_keys_file : Optional[str]
+            hot keys manifest, default: the env var CONFIGLOOKUP_HOT_KEYS_FILE, see record_hot_keys
         Raises
         ------
         FileNotFoundError
@@ -56,9 +164,33 @@ class Configuration(metaclass=SingletonMeta):
         """
         super(Configuration, self).__init__()
         log.info(
-            f"[__init__|in] ({files_path}, {files_prefix}, {files_additional_suffixes}, " f"{files}, {environment})"
+            f"[__init__|in] ({files_path}, {files_prefix}, {files_additional_suffixes}, "
+            f"{files}, {environment}, {reader}, {'snapshot' if snapshot is not None else None})"
         )
-        self.__load(files_path, files_prefix, files_additional_suffixes, files, environment)
+        # (property prefix, callback) pairs to be told about changes
+        self.__subscribers: List[Tuple[str, Callable[[List[str]], Any]]] = []
+        # no configuration loaded yet, so nothing to compare with
+        self.__state: Optional[ConfigurationState] = None
+        self.__overrides: Dict[str, Any] = {}
+        # overriders registered, kept across loads, see register_overrider
+        self.__registered: List[AbstractOverrider] = []
+        # serializes changes, readers just pick the current state
+        self.__lock = threading.RLock()
+        # increased on every change, handles rely on it to know when to resolve values again
+        self.__version = [0]
+        self.__handles: Dict[str, ConfigurationHandle] = {}
+        # (dict read by the reader, state built out of it), to tell when a reader had nothing new
+        self.__read: Optional[Tuple[Dict[str, Any], ConfigurationState]] = None
+        # (section, class) => (version, bound instance)
+        self.__bindings: Dict[Tuple[str, type], Tuple[int, Any]] = {}
+        # hot keys manifest, keys read from it on load and the ones accessed, when recording, see record_hot_keys
+        self.__hot_keys_file: Optional[str] = None
+        self.__accessed: Optional[Set[str]] = None
+        if hot_keys_file is None:
+            hot_keys_file = os.environ.get(Configuration.VAR_CONFIGURATION_HOT_KEYS_FILE)
+        if hot_keys_file:
+            self.__record(hot_keys_file)
+        self.__load(files_path, files_prefix, files_additional_suffixes, files, environment, reader, snapshot)
         log.info("[__init__|out]")
 
     def __load(
@@ -68,20 +200,102 @@ class Configuration(metaclass=SingletonMeta):
         files_additional_suffixes: Optional[List[str]] = None,
         files: Optional[List[str]] = None,
         environment: Optional[str] = None,
+        reader: Optional[ConfigurationReader] = None,
+        snapshot: Optional[bytes] = None,
     ):
         log.info(
             f"[__load|in] (files_path={files_path}, files_prefix={files_prefix}, "
-            f"files_additional_suffixes={files_additional_suffixes}, files={files}, environment={environment})"
+            f"files_additional_suffixes={files_additional_suffixes}, files={files}, environment={environment}, "
+            f"reader={reader}, snapshot={'...' if snapshot is not None else None})"
         )
-        data = {}
-        # find runtime environment
-        env = (
-            ConfigurationUtils.resolve_env_variable(
-                Configuration.VAR_CONFIGURATION_ENV, Configuration.DEFAULT_CONFIGURATION_ENV
+        self.__load_args = (files_path, files_prefix, files_additional_suffixes, files, environment, reader, snapshot)
+        templates, overrides = {}, {}
+        documents, env, read = None, None, None
+        # ids of the dicts in data we can change in place, None for all
+        owned = None
+        if snapshot is not None:
+            data, templates, overrides = Configuration.__read_snapshot(snapshot)
+        elif reader is not None:
+            read = reader.read()
+            if self.__read is not None and read is self.__read[0] and self.__state is self.__read[1]:
+                # the reader had nothing new for us, and nothing was patched since
+                log.info("[__load|out] => unchanged")
+                return
+            # readers keep what they read, so references are resolved on a copy, sharing whatever is not resolved
+            data = dict(read)
+            owned = {id(data)}
+        else:
+            # find runtime environment
+            env = (
+                ConfigurationUtils.resolve_env_variable(
+                    Configuration.VAR_CONFIGURATION_ENV, Configuration.DEFAULT_CONFIGURATION_ENV
+                )
+                if environment is None
+                else environment
             )
-            if environment is None
-            else environment
-        )
+            documents = self.__read_files(files_path, files_prefix, files_additional_suffixes)
+            data = ConfigurationReader.merge_documents(documents, [Configuration.MANDATORY_CONFIGURATION_SECTION, env])
+
+        # handle overriders ...
+        self.__overriders = OverriderChain()
+        # ... overriders: the ones applied when a snapshot was exported
+        if overrides:
+            self.__overriders.append(DictOverrider(overrides))
+        # ... overriders: the ones registered
+        self.__overriders.extend(self.__registered)
+        # ... overriders: environment
+        self.__overriders.append(EnvironmentOverrider())
+
+        hot_keys = self.__read_hot_keys() if not templates else []
+        if hot_keys:
+            # the keys used last time are served as read, the rest of the keys are indexed,
+            # and references resolved, on first use
+            def build() -> Tuple[ConfigurationIndex, ConfigurationInterpolator]:
+                log.info("[__load] building the deferred configuration index")
+                # on a copy, as readers keep on reading data meanwhile
+                copy = dict(data)
+                index = ConfigurationIndex(copy, {id(copy)})
+                return index, ConfigurationInterpolator(copy, index)
+
+            state = ConfigurationState.deferred(data, build, Configuration.__index_hot_keys(data, hot_keys))
+        else:
+            index = ConfigurationIndex(data, owned)
+            # snapshots come resolved, we need the original text back to be able to resolve it with overrides
+            for prop, template in templates.items():
+                index.set(prop, template)
+            # resolve "${other.key}" references, once
+            state = ConfigurationState(data, index, ConfigurationInterpolator(data, index), {})
+
+        with self.__lock:
+            previous = self.__state
+            previous_overrides = self.__overrides
+            # a reload might bring in keys known to be missing so that cache starts afresh
+            self.__state = state
+            self.__overrides = self.__collect_overrides()
+            # what other environments views are built from, and the ones built
+            self.__sources = (documents, reader, env)
+            self.__read = None if read is None else (read, state)
+            self.__views: Dict[str, ConfigurationState] = {}
+            self.__views_base: Optional[Dict[str, Any]] = None
+            self.__version[0] += 1
+
+        if previous is not None and self.__subscribers:
+            self.__notify(state.index.diff(previous.index) + self.__diff_overrides(previous_overrides))
+        log.info(f"[__load|out] => {data}")
+
+    @staticmethod
+    def __read_snapshot(snapshot: bytes) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Any]]:
+        content = pickle.loads(snapshot)
+        if not isinstance(content, dict) or content.get("version") != Configuration.SNAPSHOT_VERSION:
+            raise ValueError("[__read_snapshot] not a configuration snapshot or not a supported version")
+        return content["data"], content["templates"], content["overrides"]
+
+    @staticmethod
+    def __read_files(
+        files_path: Optional[str],
+        files_prefix: Optional[str],
+        files_additional_suffixes: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
         # find configuration files
         _file_suffixes = list(Configuration.DEFAULT_CONFIGURATION_FILE_SUFFIXES)
         if files_additional_suffixes is not None:
@@ -102,15 +316,142 @@ class Configuration(metaclass=SingletonMeta):
             _file_suffixes,
         )
 
-        # load config from files
-        data = FileSysConfigurationReader(_files, data, [Configuration.MANDATORY_CONFIGURATION_SECTION, env]).read()
-        # handle overriders ...
-        self.__overriders = []
-        # ... overriders: environment
-        self.__overriders.append(EnvironmentOverrider())
+        # load config from files, not filtered, so that they can be merged for other environments too
+        return FileSysConfigurationReader(_files, None, []).read_documents()
+
+    def __record(self, hot_keys_file: str):
+        if self.__hot_keys_file is None:
+            atexit.register(self.__save_hot_keys_at_exit)
+        self.__hot_keys_file = hot_keys_file
+        if self.__accessed is None:
+            self.__accessed = set()
 
-        self.__data = data
-        log.info(f"[__load|out] => {self.__data}")
+    def __read_hot_keys(self) -> List[str]:
+        if self.__hot_keys_file is None:
+            return []
+        try:
+            with open(self.__hot_keys_file, "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as x:
+            log.warning(f"[__read_hot_keys] ignoring hot keys manifest {self.__hot_keys_file}: {x}")
+            return []
+        if not isinstance(content, list):
+            log.warning(f"[__read_hot_keys] ignoring hot keys manifest {self.__hot_keys_file}: not a list")
+            return []
+        return [key for key in content if isinstance(key, str)]
+
+    def __save_hot_keys_at_exit(self):
+        try:
+            self.__save_hot_keys()
+        except OSError as x:
+            log.warning(f"[__save_hot_keys_at_exit] could not save hot keys manifest {self.__hot_keys_file}: {x}")
+
+    def __save_hot_keys(self) -> List[str]:
+        result = sorted(self.__accessed.copy() if self.__accessed else ())
+        if result:
+            # written whole or not at all, as another process might be reading it
+            temp_file = f"{self.__hot_keys_file}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                json.dump(result, file)
+            os.replace(temp_file, self.__hot_keys_file)
+        return result
+
+    @staticmethod
+    def __index_hot_keys(data: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+        """properties of the keys not found as variables in data => values, the ones not depending on references"""
+        result = {}
+        for key in keys:
+            prop, var = ConfigurationUtils.prop_and_var_from_key(key)
+            if var in data:
+                # served from data already
+                continue
+            value = data
+            for component in prop.split(sep="."):
+                if not isinstance(value, dict):
+                    value = _NO_DEFAULT
+                    break
+                subkey = component if component in value else next((k for k in value if k.lower() == component), None)
+                value = value[subkey] if subkey is not None else _NO_DEFAULT
+                if value is _NO_DEFAULT:
+                    break
+            if value is not _NO_DEFAULT:
+                try:
+                    # sections come with their references resolved, and not overridden, as in the index
+                    result[prop] = Configuration.__render_section(data, value)
+                except LookupError:
+                    # left to the index
+                    pass
+        log.debug(f"[__index_hot_keys] {len(result)} of {len(keys)} keys indexed")
+        return result
+
+    @staticmethod
+    def __render_section(data: Dict[str, Any], value: Any) -> Any:
+        """a value, or a copy of it with its templates rendered, with no overrides, see __render_deferred"""
+        if isinstance(value, str) and "${" in value:
+            return Configuration.__render_deferred(data, value, lambda var: None, ())
+        if isinstance(value, dict):
+            return {k: Configuration.__render_section(data, v) for k, v in value.items()}
+        return value
+
+    @staticmethod
+    def __render_deferred(
+        data: Dict[str, Any], template: str, overridden: Callable[[str], Optional[Any]], rendering: Tuple[str, ...]
+    ) -> Any:
+        """
+        renders a template out of the variables in data, as read, so with no index nor interpolator built,
+        references to anything else, sections or circular ones raise LookupError, left for the interpolator to resolve
+        or report, rendering are the variables whose templates are being rendered
+        """
+
+        def resolve(key: str) -> Any:
+            var = ConfigurationUtils.prop_and_var_from_key(key)[1]
+            if var not in data or var in rendering or isinstance(data[var], (dict, list)):
+                raise LookupError(key)
+            result = overridden(var)
+            if result is None:
+                result = data[var]
+                if isinstance(result, str) and "${" in result:
+                    result = Configuration.__render_deferred(data, result, overridden, rendering + (var,))
+            return result
+
+        return ConfigurationInterpolator.render_text(template, resolve)
+
+    def __collect_overrides(self) -> Dict[str, Any]:
+        """the current overridden values, of every variable that can be overridden"""
+        result = {}
+        for var, value in self.__state.data.items():
+            if var == var.upper() and not isinstance(value, dict):
+                overridden = self.__get_overridden(var)
+                if overridden is not None:
+                    result[var] = overridden
+        return result
+
+    def __diff_overrides(self, previous: Dict[str, Any]) -> List[str]:
+        """the properties whose value changed between previous and current overrides"""
+        variables = [
+            var for var in previous.keys() | self.__overrides.keys() if previous.get(var) != self.__overrides.get(var)
+        ]
+        props = {ConfigurationUtils.variable_to_property(var) for var in variables}
+        props.update(self.__state.interpolator.dependents(variables))
+        return sorted(props)
+
+    def __notify(self, changes: List[str]):
+        log.debug(f"[__notify|in] ({changes})")
+        if changes:
+            for prefix, callback in list(self.__subscribers):
+                relevant = [
+                    c
+                    for c in changes
+                    if not prefix or c == prefix or c.startswith(prefix + ".") or prefix.startswith(c + ".")
+                ]
+                if relevant:
+                    try:
+                        callback(relevant)
+                    except Exception as x:
+                        log.error(f"[__notify] subscriber of {prefix} failed", exc_info=x)
+        log.debug("[__notify|out]")
 
     def __get_overridden(self, var: str) -> Optional[str]:
         """
@@ -125,16 +466,11 @@ class Configuration(metaclass=SingletonMeta):
             a value if finds its key in any overrider, the last overrider always takes precedence
         """
         log.debug(f"[_get_overridden|in] ({var})")
-        result = None
-        for overrider in self.__overriders:
-            overridden_value = overrider.get(var)
-            if overridden_value is not None:
-                result = overridden_value
-
+        result = self.__overriders.get(var)
         log.debug(f"[_get_overridden|out] => {result}")
         return result
 
-    def __get(self, key: str):
+    def __get(self, key: str, default: Any = _NO_DEFAULT):
         """
         get the configuration value
 
@@ -145,42 +481,548 @@ class Configuration(metaclass=SingletonMeta):
             property format: common.vars.myconf
             or
             env var format: COMMON__VARS__MYCONF
+        default : Any
+            value to return if the key is not found, if not provided a LookupError is raised instead
 
         Returns
         -------
             configuration value
+
+        Raises
+        ------
+        LookupError
+            if the key is not found and no default was provided
         """
+        if self.__accessed is not None:
+            self.__accessed.add(key)
+        return self.__lookup(self.__state, key, default)
+
+    def __lookup(self, state: ConfigurationState, key: str, default: Any = _NO_DEFAULT):
+        """get, on a given state, see __get"""
         log.debug(f"[get|in] ({key})")
         result = None
 
+        if key in state.missing:
+            # fast miss path, we've been asked for this one before
+            return self.__not_found(key, default)
+
         # remember, we want to find 'a.b.c' (property) and/or 'a__b__c' (variable)
         prop, var = ConfigurationUtils.prop_and_var_from_key(key)
+        result = self.__resolve(state, prop, var)
+        if result is _NO_DEFAULT:
+            if len(state.missing) >= Configuration.MISSING_KEYS_CACHE_SIZE:
+                # evict the oldest entry, other readers might be changing the cache meanwhile,
+                # in which case it is their eviction that counts
+                try:
+                    state.missing.pop(next(iter(state.missing)), None)
+                except (RuntimeError, StopIteration):
+                    pass
+            state.missing[key] = None
+            return self.__not_found(key, default)
 
-        if var in self.__data.keys():
+        log.debug(f"[get|out] => {result}")
+        return result
+
+    def __resolve(self, state: ConfigurationState, prop: str, var: str) -> Any:
+        """the value of a key, already in property and variable formats, or _NO_DEFAULT if not found"""
+        if var in state.data:
             # if it is not a complex type it should be stored as a first degree variable in the dict
-            result = self.__data[var]
+            result = state.data[var]
             # and if it is not a complex type it can be overridden
             overridden = self.__get_overridden(var)
             if overridden is not None:
                 result = overridden
+            elif state.rendered:
+                if prop in state.interpolator:
+                    # the variables it references might be overridden though
+                    result = state.interpolator.value(prop, self.__get_overridden)
+            # references are not resolved in data, templates are told by their text
+            elif isinstance(result, str) and "${" in result:
+                try:
+                    # no need to build the interpolator for references to other values in data
+                    result = Configuration.__render_deferred(state.data, result, self.__get_overridden, (var,))
+                except LookupError:
+                    result = state.interpolator.value(prop, self.__get_overridden)
         else:
-            # find the config in the data dict
-            config = ConfigurationUtils.find_property(prop, self.__data)
-            # remember every value should be defined in config, even if it is going to be overridden somewhere else
-            if config is None:
-                log.error(f"[__get] {prop} not found => {self.__data}")
-                raise LookupError(f"[get] key {key} not found")
+            result = state.hot.get(prop, _NO_DEFAULT)
+            if result is _NO_DEFAULT:
+                # find the config in the index, remember every value should be defined in config,
+                # even if it is going to be overridden somewhere else
+                indexed = state.index.find(prop)
+                result = _NO_DEFAULT if indexed is None else state.index[indexed]
+        return result
 
-            config_pointer = config["pointer"]
-            config_key = config["key"]
-            result = config_pointer[config_key]
+    @staticmethod
+    def __not_found(key: str, default: Any):
+        log.debug(f"[__get] {key} not found")
+        if default is _NO_DEFAULT:
+            raise LookupError(f"[get] key {key} not found")
+        return default
 
-        log.debug(f"[get|out] => {result}")
+    @staticmethod
+    def get(key: str, default: Any = _NO_DEFAULT):
+        """
+        get the configuration value, bootstrapping the default instance if needed
+
+        Parameters
+        ----------
+        key : str
+            configuration key, either in property format (common.vars.myconf)
+            or in env var format (COMMON__VARS__MYCONF)
+        default : Any
+            value to return if the key is not found, if not provided a LookupError is raised instead
+
+        Returns
+        -------
+            configuration value
+        """
+        return Configuration.__instance().__get(key, default)
+
+    @staticmethod
+    def keys(prefix: str = "") -> List[str]:
+        """
+        get the configuration keys under a prefix
+
+        Parameters
+        ----------
+        prefix : str
+            key prefix, in property format (server.pools) or env var format (FEATURE__),
+            or a glob pattern where '*' matches any sequence of chars and '?' any single char (server.*.url),
+            the empty prefix stands for every key
+
+        Returns
+        -------
+        List[str]
+            the sorted list of keys, in property format, found under the prefix or matching the pattern
+        """
+        prop = ConfigurationUtils.prop_and_var_from_key(prefix)[0]
+        return Configuration.__instance().__state.index.keys(prop)
+
+    @staticmethod
+    def items(prefix: str = "") -> List[Tuple[str, Any]]:
+        """
+        get the configuration entries under a prefix, with values resolved as in get
+
+        Parameters
+        ----------
+        prefix : str
+            key prefix or glob pattern, as in keys
+
+        Returns
+        -------
+        List[Tuple[str, Any]]
+            the sorted list of (key, value) pairs, with keys in property format
+        """
+        instance = Configuration.__instance()
+        # all from the same state
+        state = instance.__state
+        prop = ConfigurationUtils.prop_and_var_from_key(prefix)[0]
+        return [(k, instance.__lookup(state, k)) for k in state.index.keys(prop)]
+
+    @staticmethod
+    def subscribe(prefix: str, callback: Callable[[List[str]], Any]):
+        """
+        subscribe to changes of the configuration values under a prefix, that might happen on a reload
+        or on an overrides refresh
+
+        Parameters
+        ----------
+        prefix : str
+            key prefix, in property format (server.pools) or env var format (SERVER__POOLS),
+            the empty prefix stands for every key
+        callback : Callable[[List[str]], Any]
+            function to be called with the sorted list of changed keys, in property format, related to the prefix,
+            those under it or, if a whole section was added or removed, above it
+        """
+        prop = ConfigurationUtils.prop_and_var_from_key(prefix)[0].rstrip(".")
+        Configuration.__instance().__subscribers.append((prop, callback))
+
+    @staticmethod
+    def unsubscribe(prefix: str, callback: Callable[[List[str]], Any]):
+        """
+        cancels a subscription, see subscribe
+
+        Parameters
+        ----------
+        prefix : str
+            key prefix used when subscribing
+        callback : Callable[[List[str]], Any]
+            function used when subscribing
+        """
+        prop = ConfigurationUtils.prop_and_var_from_key(prefix)[0].rstrip(".")
+        Configuration.__instance().__subscribers.remove((prop, callback))
+
+    @staticmethod
+    def reload():
+        """
+        reloads the configuration, with the same arguments it was loaded with, telling subscribers about changes
+        """
+        instance = Configuration.__instance()
+        instance.__load(*instance.__load_args)
+
+    @staticmethod
+    def refresh():
+        """
+        reads the overridden values again, as overriders are sources that might change on their own,
+        environment variables as an example, telling subscribers about changes
+        """
+        log.info("[refresh|in]")
+        instance = Configuration.__instance()
+        with instance.__lock:
+            # overriders scopes might have changed too
+            instance.__overriders.invalidate()
+            previous = instance.__overrides
+            instance.__overrides = instance.__collect_overrides()
+            changes = instance.__diff_overrides(previous)
+            instance.__version[0] += 1
+        instance.__notify(changes)
+        log.info("[refresh|out]")
+
+    @staticmethod
+    def register_overrider(overrider: AbstractOverrider):
+        """
+        adds an overrider, taking precedence over the ones added before and the snapshot one,
+        but not over the environment overrider, which always comes last, it is kept across loads.
+        subscribers are told about the values it overrides, as in refresh
+
+        Parameters
+        ----------
+        overrider : AbstractOverrider
+            the overrider, it might declare the keys it can have values for, see AbstractOverrider.keys
+        """
+        log.info(f"[register_overrider|in] ({overrider})")
+        instance = Configuration.__instance()
+        with instance.__lock:
+            instance.__registered.append(overrider)
+            position = next(
+                (i for i, o in enumerate(instance.__overriders) if isinstance(o, EnvironmentOverrider)),
+                len(instance.__overriders),
+            )
+            instance.__overriders.insert(position, overrider)
+        Configuration.refresh()
+        log.info("[register_overrider|out]")
+
+    @staticmethod
+    def apply_patch(patch: Dict[str, Any]) -> List[str]:
+        """
+        merges a partial configuration into the live one, with the same semantics as ConfigurationUtils.merge_dict,
+        as in Configuration.apply_patch({"features": {"beta": True}}),
+        only the patched entries, and the values referencing them, are processed again, and indexed as a layer
+        on top of the current index, see ConfigurationIndex.patched, so that it costs in proportion to the patch,
+        but for copies of the references in the root dict and in the templates bookkeeping, C level dict copies.
+        the result is published at once, so concurrent readers either see the patch as a whole or not at all.
+        subscribers are told about the changes
+
+        Parameters
+        ----------
+        patch : Dict[str, Any]
+            the partial configuration to merge, in the same shape as the configuration files sections
+
+        Returns
+        -------
+        List[str]
+            the sorted list of keys, in property format, whose value changed
+
+        Raises
+        ------
+        TypeError
+            if the patch is not a dict or its key types do not match the configuration ones,
+            a section, dict or list, can't be replaced by a value either
+        ValueError
+            if the patch brings in references not found, to sections or circular
+        """
+        log.info(f"[apply_patch|in] ({patch})")
+        if not isinstance(patch, dict):
+            raise TypeError(f"[apply_patch] {patch} is not a dict")
+        instance = Configuration.__instance()
+        with instance.__lock:
+            state = instance.__state
+            index, changed = state.index.patched(patch)
+            interpolator, resolved = state.interpolator.patched(index, changed)
+            changes = set(changed)
+            changes.update(p for p in resolved if p not in state.index or state.index[p] != index[p])
+
+            # patched variables might be overridden
+            overrides = dict(instance.__overrides)
+            for prop in changed:
+                var = ConfigurationUtils.property_to_variable(prop)
+                if var in index.data and not isinstance(index.data[var], dict):
+                    overridden = instance.__get_overridden(var)
+                    if overridden is None:
+                        overrides.pop(var, None)
+                    else:
+                        overrides[var] = overridden
+
+            instance.__state = ConfigurationState(index.data, index, interpolator, {})
+            instance.__overrides = overrides
+            instance.__version[0] += 1
+
+        result = sorted(changes)
+        instance.__notify(result)
+        log.info(f"[apply_patch|out] => {result}")
+        return result
+
+    @staticmethod
+    def handle(key: str) -> ConfigurationHandle:
+        """
+        get an accessor of a configuration value, for the hot paths, the value is resolved once, overrides included,
+        and calling the handle just returns it, until the configuration changes, on load, patch or overrides refresh,
+        when it is resolved again, as in:
+            mem = Configuration.handle("server.resources.mem")
+            ...
+            mem()
+        NOTE: overrides changing on their own, env vars as an example, are only taken in after a refresh
+
+        Parameters
+        ----------
+        key : str
+            configuration key, either in property format (common.vars.myconf)
+            or in env var format (COMMON__VARS__MYCONF)
+
+        Returns
+        -------
+        ConfigurationHandle
+            the accessor, the same one for the same key
+
+        Raises
+        ------
+        LookupError
+            if the key is not found
+        """
+        instance = Configuration.__instance()
+        result = instance.__handles.get(key)
+        if result is None:
+            prop, var = ConfigurationUtils.prop_and_var_from_key(key)
+
+            def resolve() -> Any:
+                value = instance.__resolve(instance.__state, prop, var)
+                if value is _NO_DEFAULT:
+                    raise LookupError(f"[handle] key {key} not found")
+                return value
+
+            result = ConfigurationHandle(key, resolve, instance.__version)
+            instance.__handles[key] = result
+        return result
+
+    @staticmethod
+    def bind(prefix: str, cls: Type[T]) -> T:
+        """
+        get a configuration section as an instance of a user declared dataclass or class with __slots__,
+        every field filled with the key named after it in the section, overrides included,
+        and converted to the field type hint, so that reading it is a plain attribute access, as in:
+            @dataclass
+            class ResourcesCfg:
+                mem: int
+                color: str = "yellow"
+
+            resources = Configuration.bind("server.resources", ResourcesCfg)
+            ...
+            resources.mem
+        the instance is only built again when the configuration changes, on load, patch or overrides refresh,
+        so it should not be kept around but asked for, it is cheap
+
+        Parameters
+        ----------
+        prefix : str
+            configuration section, either in property format (server.resources)
+            or in env var format (SERVER__RESOURCES)
+        cls : Type[T]
+            the dataclass or class with __slots__, see ConfigurationBinder
+
+        Returns
+        -------
+        T
+            the instance, the same one until the configuration changes
+
+        Raises
+        ------
+        TypeError
+            if cls is neither a dataclass nor a class with __slots__
+        LookupError
+            if a field without default is not found in the section
+        ValueError
+            if a value can't be converted to its field type
+        """
+        instance = Configuration.__instance()
+        version = instance.__version[0]
+        cached = instance.__bindings.get((prefix, cls))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        log.debug(f"[bind|in] ({prefix}, {cls})")
+        state = instance.__state
+
+        def get(key: str) -> Any:
+            prop, var = ConfigurationUtils.prop_and_var_from_key(key)
+            value = instance.__resolve(state, prop, var)
+            return NOT_FOUND if value is _NO_DEFAULT else value
+
+        result = ConfigurationBinder.build(cls, ConfigurationUtils.prop_and_var_from_key(prefix)[0], get)
+        instance.__bindings[(prefix, cls)] = (version, result)
+        log.debug(f"[bind|out] => {result}")
         return result
 
     @staticmethod
-    def get(key: str):
+    def record_hot_keys(hot_keys_file: str):
+        """
+        records the keys accessed with get, from now on, and saves them to a manifest on exit, see save_hot_keys.
+        when a configuration is loaded, with a manifest around, the keys in it are served right away and
+        the rest of the keys are indexed, and their references resolved, on first use, so that startup depends
+        on the keys the process actually uses and not on the whole configuration.
+        the manifest is better set on creation, with the env var CONFIGLOOKUP_HOT_KEYS_FILE, so that it is used
+        on the first load too
+        NOTE: on first use references not found or circular raise ValueError, instead of on load
+
+        Parameters
+        ----------
+        hot_keys_file : str
+            the manifest path
+        """
+        log.info(f"[record_hot_keys|in] ({hot_keys_file})")
+        instance = Configuration.__instance()
+        with instance.__lock:
+            instance.__record(hot_keys_file)
+        log.info("[record_hot_keys|out]")
+
+    @staticmethod
+    def save_hot_keys() -> List[str]:
+        """
+        saves the keys accessed with get to the hot keys manifest, if any was, see record_hot_keys
+
+        Returns
+        -------
+        List[str]
+            the sorted list of keys saved
+
+        Raises
+        ------
+        ValueError
+            if keys are not being recorded
+        OSError
+            if the manifest can't be written
+        """
+        instance = Configuration.__instance()
+        if instance.__accessed is None:
+            raise ValueError("[save_hot_keys] keys are not being recorded")
+        with instance.__lock:
+            result = instance.__save_hot_keys()
+        log.info(f"[save_hot_keys] => {len(result)} keys")
+        return result
+
+    @staticmethod
+    def view(environment: str) -> "ConfigurationView":
+        """
+        get the configuration of an environment, other than the one loaded, without reading its sources again.
+        views are built from the documents read on load, merging the "common" section and the environment one,
+        and cached until the next load. the subtrees equal to the "common" ones are shared across views.
+        values are overridden as in get, patches only apply to the environment loaded
+
+        Parameters
+        ----------
+        environment : str
+            the environment, as in "prod"
+
+        Returns
+        -------
+        ConfigurationView
+            the configuration of the environment
+
+        Raises
+        ------
+        ValueError
+            if the configuration was loaded from a snapshot, or from a reader not supporting read_documents,
+            as there are no sources to build views from
+        """
+        log.debug(f"[view|in] ({environment})")
+        instance = Configuration.__instance()
+        with instance.__lock:
+            documents, reader, current = instance.__sources
+            if environment == current:
+                state = instance.__state
+            elif environment in instance.__views:
+                state = instance.__views[environment]
+            else:
+                if documents is None:
+                    if reader is None or type(reader).read_documents is ConfigurationReader.read_documents:
+                        # loaded from a snapshot or from a reader not providing the documents
+                        raise ValueError("[view] no configuration sources to build views from")
+                    documents = reader.read_documents()
+                    instance.__sources = (documents, reader, current)
+                if instance.__views_base is None:
+                    instance.__views_base = ConfigurationReader.merge_documents(
+                        documents, [Configuration.MANDATORY_CONFIGURATION_SECTION]
+                    )
+                data = ConfigurationReader.merge_documents(
+                    documents, [Configuration.MANDATORY_CONFIGURATION_SECTION, environment]
+                )
+                owned = ConfigurationUtils.share_dict(data, instance.__views_base)
+                index = ConfigurationIndex(data, owned)
+                state = ConfigurationState(data, index, ConfigurationInterpolator(data, index), {})
+                instance.__views[environment] = state
+        log.debug("[view|out]")
+        return ConfigurationView(state, instance.__lookup)
+
+    @staticmethod
+    def export_snapshot() -> bytes:
+        """
+        exports the configuration, as resolved, including the values overridden at the moment,
+        so that another process can load it without reading any source, see import_snapshot
+
+        Returns
+        -------
+        bytes
+            the serialized snapshot
+        """
+        log.info("[export_snapshot|in]")
+        instance = Configuration.__instance()
+        state = instance.__state
+        content = {
+            "version": Configuration.SNAPSHOT_VERSION,
+            "data": state.data,
+            "templates": state.interpolator.templates,
+            "overrides": instance.__collect_overrides(),
+        }
+        result = pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
+        log.info(f"[export_snapshot|out] => {len(result)} bytes")
+        return result
+
+    @staticmethod
+    def import_snapshot(snapshot: Union[bytes, int]):
+        """
+        loads a snapshot exported by another process, bootstrapping the instance if needed,
+        can be used as a multiprocessing pool initializer, as in:
+            Pool(initializer=Configuration.import_snapshot, initargs=(Configuration.export_snapshot(),))
+        NOTE: snapshots are pickled, only import the ones of processes you trust
+
+        Parameters
+        ----------
+        snapshot : Union[bytes, int]
+            the snapshot or a file descriptor, inherited from the parent process, where it can be read from
+        """
+        log.info(f"[import_snapshot|in] ({'...' if isinstance(snapshot, bytes) else snapshot})")
+        if isinstance(snapshot, int):
+            snapshot = Configuration.__read_fd(snapshot)
+        if Configuration not in Configuration._instances:
+            Configuration(snapshot=snapshot)
+        else:
+            Configuration._instances[Configuration].__load(snapshot=snapshot)
+        log.info("[import_snapshot|out]")
+
+    @staticmethod
+    def __read_fd(fd: int) -> bytes:
+        with os.fdopen(fd, "rb", closefd=False) as file:
+            if file.seekable():
+                file.seek(0)
+            return file.read()
+
+    @staticmethod
+    def __instance() -> "Configuration":
         if Configuration not in (Configuration._instances):
-            log.info(f"[get_instance] creating a default instance as it wasn't bootstrapped before")
-            Configuration()
-        return Configuration._instances[Configuration].__get(key)
+            snapshot_fd = os.environ.get(Configuration.VAR_CONFIGURATION_SNAPSHOT_FD)
+            if snapshot_fd is not None:
+                log.info(f"[get_instance] creating an instance from the snapshot in file descriptor {snapshot_fd}")
+                Configuration.import_snapshot(int(snapshot_fd))
+            else:
+                log.info(f"[get_instance] creating a default instance as it wasn't bootstrapped before")
+                Configuration()
+        return Configuration._instances[Configuration]
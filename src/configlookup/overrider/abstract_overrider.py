@@ -1,6 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 log = logging.getLogger(__name__)
 
@@ -32,3 +32,27 @@ class AbstractOverrider(ABC):
         -------
             the value for the key
         """
+
+    def keys(self) -> Optional[Set[str]]:
+        """
+        the keys this overrider can possibly have a value for, so that it is not asked about any other,
+        see prefixes, by default it is asked about every key
+
+        Returns
+        -------
+        Optional[Set[str]]
+            the keys, in env var format, or None if unknown
+        """
+        return None
+
+    def prefixes(self) -> Optional[List[str]]:
+        """
+        the prefixes of the keys this overrider can possibly have a value for, so that it is not asked about any other,
+        as in "SERVER__" for the keys under "server", see keys, by default it is asked about every key
+
+        Returns
+        -------
+        Optional[List[str]]
+            the prefixes, in env var format, or None if unknown
+        """
+        return None
@@ -0,0 +1,27 @@
+import logging
+from typing import Any, Dict, Optional, Set
+
+from configlookup.overrider.abstract_overrider import AbstractOverrider
+
+log = logging.getLogger(__name__)
+
+
+class DictOverrider(AbstractOverrider):
+    """
+    class to override configuration values with the ones found in a dict, keyed by variable
+    to be used in Configuration
+    example:
+         {"SERVER__URL": "http://other.site.com"} overrides "server.url"
+    """
+
+    def __init__(self, values: Dict[str, Any]):
+        self.__values = dict(values)
+
+    def get(self, key: str) -> Any:
+        log.debug(f"[get|in] ({key})")
+        result = self.__values.get(key)
+        log.debug(f"[get|out] => {result if result is not None else 'None'}")
+        return result
+
+    def keys(self) -> Optional[Set[str]]:
+        return set(self.__values)
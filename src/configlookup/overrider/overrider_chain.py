@@ -0,0 +1,97 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class OverriderChain(list):
+    """
+    list of overriders, in ascending precedence, the last one always takes precedence,
+    that looks values up from the last overrider down and stops at the first one having a value.
+    overriders are only asked about the keys in their scope, see AbstractOverrider.keys and AbstractOverrider.prefixes,
+    the overriders to ask about a key are worked out on its first lookup, and again whenever the list is changed
+    or invalidate is called, as when the overriders scopes change
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # key => get methods of the overriders in scope, highest precedence first
+        self.__plans: Dict[str, Tuple[Callable[[str], Any], ...]] = {}
+        # (get method, keys, prefixes) of every overrider, highest precedence first, None until compiled
+        self.__compiled: Optional[Tuple[Tuple[Callable[[str], Any], Optional[frozenset], Optional[tuple]], ...]] = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        get the overridden value of a key
+
+        Parameters
+        ----------
+        key : str
+            the key, in env var format
+
+        Returns
+        -------
+            the value of the overrider with the highest precedence having one or None
+        """
+        plan = self.__plans.get(key)
+        if plan is None:
+            plan = self.__plan(key)
+        for get in plan:
+            result = get(key)
+            if result is not None:
+                return result
+        return None
+
+    def __plan(self, key: str) -> Tuple[Callable[[str], Any], ...]:
+        compiled = self.__compiled
+        if compiled is None:
+            compiled = tuple(
+                (
+                    overrider.get,
+                    None if overrider.keys() is None else frozenset(overrider.keys()),
+                    None if overrider.prefixes() is None else tuple(overrider.prefixes()),
+                )
+                for overrider in reversed(self)
+            )
+            self.__compiled = compiled
+        result = tuple(
+            get
+            for get, keys, prefixes in compiled
+            if (keys is None and prefixes is None)
+            or (keys is not None and key in keys)
+            or (prefixes is not None and key.startswith(prefixes))
+        )
+        self.__plans[key] = result
+        return result
+
+    def invalidate(self):
+        """forgets the overriders in scope of every key, to be worked out again on their next lookup"""
+        log.debug("[invalidate]")
+        self.__compiled = None
+        self.__plans = {}
+
+    def __changed(name: str) -> Callable:
+        method = getattr(list, name)
+
+        def changed(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            self.invalidate()
+            return result
+
+        changed.__name__ = name
+        return changed
+
+    append = __changed("append")
+    insert = __changed("insert")
+    extend = __changed("extend")
+    remove = __changed("remove")
+    pop = __changed("pop")
+    clear = __changed("clear")
+    sort = __changed("sort")
+    reverse = __changed("reverse")
+    __setitem__ = __changed("__setitem__")
+    __delitem__ = __changed("__delitem__")
+    __iadd__ = __changed("__iadd__")
+    __imul__ = __changed("__imul__")
+
+    del __changed
@@ -1,10 +1,15 @@
+import copy
+import http.client
 import json
 import logging
 import os
 import re
+import threading
 import zipfile
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
 from configlookup.utils import ConfigurationUtils
 
@@ -27,6 +32,81 @@ class ConfigurationReader(ABC):
             a dictionary with the overall configuration structure
         """
 
+    def read_documents(self) -> List[Dict[str, Any]]:
+        """
+        reads the configuration documents from the source, as they are, not filtered nor merged,
+        so that they can be merged for different filter keys, see merge_documents.
+        optional, readers not supporting it raise NotImplementedError, and no views of other environments
+        can be built out of them, see Configuration.view
+
+        Returns
+        -------
+            the documents, in merge order
+        """
+        raise NotImplementedError(f"[read_documents] not supported by {type(self).__name__}")
+
+    @staticmethod
+    def merge_documents(
+        documents: List[Dict[str, Any]], filter_keys: List[str], data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        filters and merges configuration documents, in order, see filter_content
+
+        Parameters
+        ----------
+        documents : List[Dict[str, Any]]
+            the documents, left untouched
+        filter_keys : List[str]
+            the first level keys to keep from every document
+        data : Optional[Dict[str, Any]]
+            dict to load with the values, a new one if not provided
+
+        Returns
+        -------
+            the merged configuration dict
+        """
+        result = {} if data is None else data
+        for document in documents:
+            ConfigurationUtils.merge_dict(ConfigurationReader.filter_content(document, filter_keys), result)
+        return result
+
+    @staticmethod
+    def filter_content(content: Dict[str, Any], filter_keys: List[str]) -> Dict[str, Any]:
+        """
+        filters the configuration content by its first level keys, merging the entries found in order
+
+        Parameters
+        ----------
+        content : Dict[str, Any]
+            the content of a configuration source, conveyed in a dict
+        filter_keys : List[str]
+            the first level keys to keep, if empty the content is kept as it is
+
+        Returns
+        -------
+            the filtered content
+
+        Raises
+        ------
+        ValueError
+            if a filter key does not correspond to a nested dict
+        """
+        if 0 == len(filter_keys):
+            return content
+
+        # we must filter first level keys in the dict
+        filtered_content = {}
+        for filter_key in filter_keys:
+            if filter_key in content.keys():
+                filtered_entry = content[filter_key]
+
+                filtered_entry_type = type(filtered_entry).__name__
+                if filtered_entry_type != "dict":
+                    raise ValueError(f"[filter_content] filter key:{filter_key} does not correspond to a nested dict")
+                else:
+                    ConfigurationUtils.merge_dict(filtered_entry, filtered_content)
+        return filtered_content
+
 
 class FileSysConfigurationReader(ConfigurationReader):
     """
@@ -37,7 +117,15 @@ class FileSysConfigurationReader(ConfigurationReader):
     ZIP_INCLUDED_FILE_PATTERN_COMPILED = re.compile(".*\\.zip/.*")
     ZIP_INCLUDED_FILE_PATTERN = r"(.*\.zip)/(.*)"
 
-    def __init__(self, fs_refs: Union[List[str], str], data: Optional[Dict[str, Any]], filter_keys: List[str]):
+    def __init__(
+        self,
+        fs_refs: Union[List[str], str],
+        data: Optional[Dict[str, Any]],
+        filter_keys: List[str],
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        use_manifest: bool = False,
+    ):
         """
         loads values from configuration json files into a dict
 
@@ -54,12 +142,26 @@ class FileSysConfigurationReader(ConfigurationReader):
                     "dev": {...},
                     "prod": {...}
                 }
+        include : Optional[List[str]]
+            glob patterns the files found in folders must match, relative to the folder, as in "*.json"
+        exclude : Optional[List[str]]
+            glob patterns the files found in folders must not match, relative to the folder, as in "legacy/*"
+        use_manifest : bool
+            reuse the manifest of previous scans of the folders, while they are not modified,
+            see ConfigurationUtils.scan_dir
         """
         super().__init__()
-        log.info(f"[__init__|in] (fs_refs: {fs_refs}, data: ..., filter_keys: {filter_keys})")
+        log.info(
+            f"[__init__|in] (fs_refs: {fs_refs}, data: ..., filter_keys: {filter_keys}, include: {include}, "
+            f"exclude: {exclude}, use_manifest: {use_manifest})"
+        )
         self.__fs_refs = fs_refs
         self.__data = data or {}
         self.__filter_keys = filter_keys or []
+        self.__include = include
+        self.__exclude = exclude
+        self.__use_manifest = use_manifest
+        self.__documents: List[Dict[str, Any]] = []
         log.info(f"[__init__|out]")
 
     def read(self) -> dict:
@@ -71,6 +173,20 @@ class FileSysConfigurationReader(ConfigurationReader):
             a dictionary with the overall configuration structure
         """
         log.debug(f"[read|in]")
+        ConfigurationReader.merge_documents(self.read_documents(), self.__filter_keys, self.__data)
+        log.debug(f"[read|out] => {self.__data}")
+        return self.__data
+
+    def read_documents(self) -> List[Dict[str, Any]]:
+        """
+        reads the provided json files and/or folders, see ConfigurationReader.read_documents
+
+        Returns
+        -------
+            the parsed files, in merge order
+        """
+        log.debug(f"[read_documents|in]")
+        self.__documents = []
 
         input_type = type(self.__fs_refs).__name__
         if input_type == "str":
@@ -88,36 +204,20 @@ class FileSysConfigurationReader(ConfigurationReader):
         else:
             raise TypeError(f"[read] {self.__fs_refs} is neither a list nor a string")
 
-        log.debug(f"[read|out] => {self.__data}")
-        return self.__data
+        log.debug(f"[read_documents|out] => {len(self.__documents)} documents")
+        return self.__documents
 
     def __process_file_content(self, content: Dict[str, Any]):
         """
-        parses the configuration content, normally a dict reflecting the json configuration,
-        and loads it into the private data structure (self.__data)
+        takes in the configuration content, normally a dict reflecting the json configuration,
+        as the next document to merge
         Parameters
         ----------
         content : str
             the content of a configuration file, conveyed in a dict
         """
         log.debug(f"[__process_file_content|in] ({content})")
-        if 0 < len(self.__filter_keys):
-            # we must filter first level keys in the dict
-            filtered_content = {}
-            for filter_key in self.__filter_keys:
-                if filter_key in content.keys():
-                    filtered_entry = content[filter_key]
-
-                    filtered_entry_type = type(filtered_entry).__name__
-                    if filtered_entry_type != "dict":
-                        raise ValueError(
-                            f"[__process_file_content] filter key:{filter_key} does not correspond to a nested dict"
-                        )
-                    else:
-                        ConfigurationUtils.merge_dict(filtered_entry, filtered_content)
-            content = filtered_content
-
-        ConfigurationUtils.merge_dict(content, self.__data)
+        self.__documents.append(content)
         log.debug(f"[__process_file_content|out]")
 
     def __handle_array(self, source: List[str]):
@@ -156,13 +256,195 @@ class FileSysConfigurationReader(ConfigurationReader):
     def __handle_dir(self, source: str):
         log.debug(f"[handle_dir|in] ({source})")
 
-        for file in os.listdir(source):
-            entry = os.path.join(source, file)
-            if os.path.isdir(entry):
-                self.__handle_dir(entry)
-            elif os.path.isfile(entry):
-                self.__handle_file(entry)
-            else:
-                raise ValueError(f"[handle_dir] {entry} is neither a file nor a folder")
+        # files come sorted by path, for a deterministic merge order
+        for entry in ConfigurationUtils.scan_dir(source, self.__include, self.__exclude, self.__use_manifest):
+            self.__handle_file(entry)
 
         log.debug(f"[handle_dir|out]")
+
+
+class HttpConfigurationReader(ConfigurationReader):
+    """
+    ConfigurationReader http implementation, reads configuration json documents from urls.
+    documents are fetched concurrently over persistent connections, kept in a pool to be reused across reads,
+    and with conditional requests, so that when no document changed since the last read, as in all of them
+    answered with "304 Not Modified", nothing is parsed nor merged and the last result is returned as it is
+    """
+
+    DEFAULT_TIMEOUT = 10.0
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(
+        self,
+        urls: Union[List[str], str],
+        data: Optional[Dict[str, Any]],
+        filter_keys: List[str],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Parameters
+        ----------
+        urls : Union[list, str]
+            urls of json documents, merged in the provided order
+        data : dict = None
+            dict to load with the values, on every read a copy of it is loaded
+        filter_keys : List[str] = []
+            enables the filtering of configuration document entries by its first level key, see
+            FileSysConfigurationReader
+        headers : Optional[Dict[str, str]]
+            additional headers to send on every request, as in authorization ones
+        timeout : float
+            connection timeout, in seconds
+        max_workers : int
+            maximum number of documents fetched concurrently
+        """
+        super().__init__()
+        log.info(f"[__init__|in] (urls: {urls}, data: ..., filter_keys: {filter_keys}, max_workers: {max_workers})")
+        self.__urls = [urls] if isinstance(urls, str) else list(urls)
+        self.__data = data or {}
+        self.__filter_keys = filter_keys or []
+        self.__headers = headers or {}
+        self.__timeout = timeout
+        self.__max_workers = max_workers
+        # url => (etag, parsed content) of the last successful fetch
+        self.__documents: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+        self.__result: Optional[Dict[str, Any]] = None
+        # whether documents changed since the result was merged
+        self.__stale = True
+        # (scheme, netloc) => idle connections
+        self.__connections: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self.__lock = threading.Lock()
+        log.info(f"[__init__|out]")
+
+    def read(self) -> dict:
+        """
+        reads configuration values from the urls
+
+        Returns
+        -------
+            a dictionary with the overall configuration structure, the very same one returned by the previous read
+            if no document changed
+
+        Raises
+        ------
+        ConnectionError
+            if some url responds with an unexpected status
+        """
+        log.debug(f"[read|in]")
+        self.__fetch_all()
+        if self.__stale:
+            documents = [self.__documents[url][1] for url in self.__urls]
+            self.__result = ConfigurationReader.merge_documents(
+                documents, self.__filter_keys, copy.deepcopy(self.__data)
+            )
+            self.__stale = False
+        else:
+            log.debug("[read] nothing changed")
+
+        log.debug(f"[read|out] => {self.__result}")
+        return self.__result
+
+    def read_documents(self) -> List[Dict[str, Any]]:
+        """
+        reads the documents from the urls, see ConfigurationReader.read_documents,
+        only the ones modified since the last read are parsed again
+
+        Returns
+        -------
+            the parsed documents, in merge order
+
+        Raises
+        ------
+        ConnectionError
+            if some url responds with an unexpected status
+        """
+        log.debug(f"[read_documents|in]")
+        self.__fetch_all()
+        result = [self.__documents[url][1] for url in self.__urls]
+        log.debug(f"[read_documents|out] => {len(result)} documents")
+        return result
+
+    def __fetch_all(self):
+        if 1 == len(self.__urls):
+            modified = [self.__fetch(self.__urls[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.__max_workers, len(self.__urls))) as executor:
+                modified = list(executor.map(self.__fetch, self.__urls))
+        if any(modified):
+            self.__stale = True
+
+    def close(self):
+        """
+        closes the pooled connections
+        """
+        with self.__lock:
+            for connections in self.__connections.values():
+                for connection in connections:
+                    connection.close()
+            self.__connections = {}
+
+    def __fetch(self, url: str) -> bool:
+        """fetches a document, unless not modified, returning whether it was"""
+        log.debug(f"[__fetch|in] ({url})")
+        parsed = urlsplit(url)
+        target = parsed.path or "/"
+        if parsed.query:
+            target = f"{target}?{parsed.query}"
+        headers = dict(self.__headers)
+        headers["Accept"] = "application/json"
+        document = self.__documents.get(url)
+        if document is not None and document[0] is not None:
+            headers["If-None-Match"] = document[0]
+
+        connection = self.__acquire(parsed.scheme, parsed.netloc)
+        try:
+            response = self.__request(connection, target, headers)
+            body = response.read()
+        except Exception:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self.__release(parsed.scheme, parsed.netloc, connection)
+
+        if response.status == 304 and document is not None:
+            result = False
+        elif response.status == 200:
+            self.__documents[url] = (response.getheader("ETag"), json.loads(body.decode("utf-8")))
+            result = True
+        else:
+            raise ConnectionError(f"[__fetch] {url} responded with {response.status} {response.reason}")
+        log.debug(f"[__fetch|out] => {result}")
+        return result
+
+    @staticmethod
+    def __request(
+        connection: http.client.HTTPConnection, target: str, headers: Dict[str, str]
+    ) -> http.client.HTTPResponse:
+        try:
+            connection.request("GET", target, headers=headers)
+            return connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # the server might have closed an idle pooled connection, give it a second go on a fresh one
+            log.debug("[__request] connection dropped, reconnecting")
+            connection.close()
+            connection.request("GET", target, headers=headers)
+            return connection.getresponse()
+
+    def __acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self.__lock:
+            idle = self.__connections.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.__timeout)
+        elif scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.__timeout)
+        raise ValueError(f"[__acquire] unsupported scheme: {scheme}")
+
+    def __release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        with self.__lock:
+            self.__connections.setdefault((scheme, netloc), []).append(connection)
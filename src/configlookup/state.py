@@ -0,0 +1,92 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from configlookup.index import ConfigurationIndex
+from configlookup.interpolation import ConfigurationInterpolator
+
+
+class ConfigurationState:
+    """
+    the loaded configuration and its lookup structures, published as a whole, never changed afterwards,
+    so that readers holding it never see a half applied change.
+    the lookup structures can also be built on first use, see deferred
+    """
+
+    __slots__ = ("data", "missing", "hot", "rendered", "__index", "__interpolator", "__build", "__lock")
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        index: Optional[ConfigurationIndex],
+        interpolator: Optional[ConfigurationInterpolator],
+        missing: Dict[str, None],
+    ):
+        self.data = data
+        self.__index = index
+        self.__interpolator = interpolator
+        # bounded cache of keys known to be missing, the only part readers write to
+        self.missing = missing
+        # properties resolved ahead of the index => values, see deferred
+        self.hot: Dict[str, Any] = {}
+        # whether references in data are resolved, otherwise templates are to be found by their text
+        self.rendered = True
+        self.__build: Optional[Callable[[], Tuple[ConfigurationIndex, ConfigurationInterpolator]]] = None
+        self.__lock: Optional[threading.Lock] = None
+
+    @staticmethod
+    def deferred(
+        data: Dict[str, Any],
+        build: Callable[[], Tuple[ConfigurationIndex, ConfigurationInterpolator]],
+        hot: Dict[str, Any],
+    ) -> "ConfigurationState":
+        """
+        creates a state whose index and interpolator are built on first use, data is left as read,
+        with references not resolved, so build must work on a copy of it, meanwhile keys are
+        served from data and hot
+
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            the merged configuration dict, as built by ConfigurationUtils.merge_dict
+        build : Callable[[], Tuple[ConfigurationIndex, ConfigurationInterpolator]]
+            function building the index and the interpolator
+        hot : Dict[str, Any]
+            properties, other than the variables in data, whose values are known not to depend on references
+
+        Returns
+        -------
+        ConfigurationState
+            the state
+        """
+        result = ConfigurationState(data, None, None, {})
+        result.hot = hot
+        result.rendered = False
+        result.__build = build
+        result.__lock = threading.Lock()
+        return result
+
+    @property
+    def built(self) -> bool:
+        """whether the index and the interpolator are built"""
+        return self.__index is not None
+
+    @property
+    def index(self) -> ConfigurationIndex:
+        if self.__index is None:
+            self.__ensure()
+        return self.__index
+
+    @property
+    def interpolator(self) -> ConfigurationInterpolator:
+        if self.__index is None:
+            self.__ensure()
+        return self.__interpolator
+
+    def __ensure(self):
+        with self.__lock:
+            if self.__index is None:
+                index, interpolator = self.__build()
+                # the index last, as it tells whether it is all built
+                self.__interpolator = interpolator
+                self.__index = index
+                self.__build = None
@@ -1,12 +1,18 @@
 import logging
 import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+import re
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 log = logging.getLogger(__name__)
 
 
 class ConfigurationUtils:
+    # list index in property keys, as in "servers[2].host"
+    INDEX_PATTERN = re.compile(r"\[(\d+)\]")
+    # (directory, include, exclude) => ({scanned directory: mtime}, files found), see scan_dir
+    __manifests: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], Tuple[Dict[str, int], List[str]]] = {}
+
     @staticmethod
     def merge_dict(
         source: Dict[str, Any],
@@ -66,9 +72,8 @@ class ConfigurationUtils:
                 elif type(target[adding_key]).__name__ != "list":
                     raise TypeError(f"key: {adding_key} type does not match")
 
-                existing_list = target[adding_key]
-                existing_list.extend(adding_value)
-                target[adding_key] = list(set(existing_list))
+                # a new list, as the existing one might be shared, with its variable for one
+                target[adding_key] = ConfigurationUtils.unique(target[adding_key] + adding_value)
                 # set the equivalent variable
                 if target_root != target:
                     adding_property = f"{'' if target_property is None else (target_property + '.')}{adding_key}"
@@ -122,12 +127,19 @@ class ConfigurationUtils:
 
         result = None
 
-        # split the key in sub keys and start descending the dict structure from its root
-        components = key.split(sep=".")
+        # split the key in sub keys, list indexes included, and start descending the dict structure from its root
+        components = ConfigurationUtils.INDEX_PATTERN.sub(r".\1", key).split(sep=".")
 
         for index, subkey in enumerate(components):
+            if isinstance(target, list):
+                # lists can only be indexed, no sub keys skipped
+                if not subkey.isdigit() or int(subkey) >= len(target):
+                    break
+                subkey = int(subkey)
+            elif not isinstance(target, dict):
+                break
             # at every level of the structure check if the current sub key is present
-            if subkey in target.keys():
+            if subkey in (target.keys() if isinstance(target, dict) else range(len(target))):
                 if index + 1 == len(components):
                     # if in last iteration and subkey and is part of the structure then wrap up in this dict format
                     result = {"pointer": target, "key": subkey}
@@ -136,12 +148,80 @@ class ConfigurationUtils:
                     remaining_subkeys = ".".join(components[index + 1 :])
                     child_structure = target[subkey]
                     result = ConfigurationUtils.find_property(remaining_subkeys, child_structure)
-                if result:
+                if result or isinstance(target, list):
                     # don't iterate further if we have a solution
                     break
         log.debug(f"[ConfigurationUtils.find_property|out] => {result}")
         return result
 
+    @staticmethod
+    def diff(old: Any, new: Any, prop: str) -> List[str]:
+        """
+        finds the properties that differ between two versions of a configuration structure,
+        in a single pass, comparing every leaf once and skipping the subtrees that are the same object,
+        as patched configurations share the ones not changed
+
+        Parameters
+        ----------
+        old : Any
+            the old value of the property
+        new : Any
+            the new value of the property
+        prop : str
+            the property the values belong to, in format "a.b.c"
+
+        Returns
+        -------
+        List[str]
+            the changed properties, for nested dicts the changed leaves, and the top most property of
+            added, removed or retyped subtrees
+        """
+        if old is new:
+            return []
+        if type(old) is dict and type(new) is dict:
+            result = []
+            new_keys = {k.lower(): k for k in new.keys()}
+            for old_key in old.keys():
+                new_key = new_keys.pop(old_key.lower(), None)
+                child_prop = f"{prop}.{old_key.lower()}"
+                if new_key is None:
+                    result.append(child_prop)
+                else:
+                    result.extend(ConfigurationUtils.diff(old[old_key], new[new_key], child_prop))
+            result.extend(f"{prop}.{k}" for k in new_keys.keys())
+            return result
+        if type(old) is type(new) and old == new:
+            return []
+        return [prop]
+
+    @staticmethod
+    def share_dict(target: Dict[str, Any], base: Dict[str, Any]) -> Set[int]:
+        """
+        replaces the nested dicts in target that are equal to the ones in the same place in base with the base ones,
+        so that both share them
+
+        Parameters
+        ----------
+        target : Dict[str, Any]
+            the dictionary to share subtrees of base
+        base : Dict[str, Any]
+            the dictionary providing the subtrees
+
+        Returns
+        -------
+        Set[int]
+            the ids of the dicts in target not shared with base, the ones that can be changed in place
+        """
+        result = {id(target)}
+        for key, value in target.items():
+            if type(value) is dict:
+                base_value = base.get(key)
+                if type(base_value) is dict and value == base_value:
+                    target[key] = base_value
+                else:
+                    result.update(ConfigurationUtils.share_dict(value, base_value if type(base_value) is dict else {}))
+        return result
+
     @staticmethod
     def get_config_file_paths(config_dir: str, config_file_prefix: str, config_file_suffixes: List[str]):
         """Function that looks for the required config files in dir_path.
@@ -172,7 +252,8 @@ class ConfigurationUtils:
         file_paths = []
         files_to_find = [f"{config_file_prefix}{x}.json" for x in config_file_suffixes]
         log.info(f"[ConfigurationUtils.get_config_file_paths] files_to_find: {files_to_find}")
-        available_files = [x.name for x in Path(config_dir).iterdir() if x.is_file()]
+        with os.scandir(os.fspath(config_dir)) as entries:
+            available_files = {x.name for x in entries if x.is_file()}
         for file_to_find in files_to_find:
             if file_to_find in available_files:
                 file_paths.append(f"{config_dir}/{file_to_find}")
@@ -185,6 +266,94 @@ class ConfigurationUtils:
         log.info(f"[ConfigurationUtils.get_config_file_paths|out] => {file_paths}")
         return file_paths
 
+    @staticmethod
+    def scan_dir(
+        config_dir: str,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        use_manifest: bool = False,
+    ) -> List[str]:
+        """
+        finds the files in a directory tree, in a deterministic order, entries sorted by name at every level,
+        relying on the entry types provided by os.scandir so that files aren't stat'ed one by one
+
+        Parameters
+        ----------
+        config_dir : str
+            the directory to scan
+        include : Optional[List[str]]
+            glob patterns, as in "*.json", a file path relative to config_dir must match one of them to be
+            included, default: every file is included
+        exclude : Optional[List[str]]
+            glob patterns, as in "legacy/*", a file path relative to config_dir must not match any of them
+            to be included
+        use_manifest : bool
+            keep the manifest of the scan, the directories scanned and files found, to be reused by subsequent
+            scans with the same arguments, while no directory in the tree has been modified
+
+        Returns
+        -------
+        List[str]
+            the paths of the files found
+
+        Raises
+        ------
+        ValueError
+            if an entry is neither a file nor a folder
+        """
+        log.debug(f"[ConfigurationUtils.scan_dir|in] ({config_dir}, {include}, {exclude}, {use_manifest})")
+        manifest_key = (config_dir, tuple(include or ()), tuple(exclude or ()))
+        if use_manifest:
+            manifest = ConfigurationUtils.__manifests.get(manifest_key)
+            if manifest is not None and all(
+                ConfigurationUtils.__mtime(directory) == mtime for directory, mtime in manifest[0].items()
+            ):
+                log.debug(f"[ConfigurationUtils.scan_dir|out] => manifest {manifest[1]}")
+                return list(manifest[1])
+
+        directories = {}
+        result = []
+        ConfigurationUtils.__scan_dir(config_dir, "", include, exclude, directories, result)
+        if use_manifest:
+            ConfigurationUtils.__manifests[manifest_key] = (directories, list(result))
+
+        log.debug(f"[ConfigurationUtils.scan_dir|out] => {result}")
+        return result
+
+    @staticmethod
+    def __scan_dir(
+        directory: str,
+        relative: str,
+        include: Optional[List[str]],
+        exclude: Optional[List[str]],
+        directories: Dict[str, int],
+        result: List[str],
+    ):
+        # the directories are the only entries we stat, to validate manifests
+        directories[directory] = ConfigurationUtils.__mtime(directory)
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda e: e.name)
+
+        for entry in entries:
+            entry_relative = f"{relative}{entry.name}"
+            if entry.is_dir():
+                ConfigurationUtils.__scan_dir(entry.path, entry_relative + "/", include, exclude, directories, result)
+            elif entry.is_file():
+                if include and not any(fnmatchcase(entry_relative, pattern) for pattern in include):
+                    continue
+                if exclude and any(fnmatchcase(entry_relative, pattern) for pattern in exclude):
+                    continue
+                result.append(entry.path)
+            else:
+                raise ValueError(f"[ConfigurationUtils.scan_dir] {entry.path} is neither a file nor a folder")
+
+    @staticmethod
+    def __mtime(directory: str) -> int:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return -1
+
     @staticmethod
     def resolve_env_variable(variable: str, default: Optional[str] = None) -> str:
         log.info(f"[ConfigurationUtils.resolve_env_variable|in] ({variable}, {default})")
@@ -204,19 +373,63 @@ class ConfigurationUtils:
         log.info(f"[ConfigurationUtils.resolve_env_variable|out] => {result}")
         return result
 
+    @staticmethod
+    def unique(values: List[Any]) -> List[Any]:
+        """
+        removes duplicates from a list keeping the first occurrence of every value, in order,
+        values need not be hashable, as dicts in lists of objects
+
+        Parameters
+        ----------
+        values : List[Any]
+            the list
+
+        Returns
+        -------
+        List[Any]
+            a new list with the unique values
+        """
+        result = []
+        seen = set()
+        for value in values:
+            try:
+                if value in seen:
+                    continue
+                seen.add(value)
+            except TypeError:
+                # not hashable, compare with the ones kept
+                if value in result:
+                    continue
+            result.append(value)
+        return result
+
     @staticmethod
     def property_to_variable(prop: str) -> str:
+        if "[" in prop:
+            prop = ConfigurationUtils.INDEX_PATTERN.sub(r".\1", prop)
         return prop.upper().replace(".", "__")
 
     @staticmethod
     def variable_to_property(var: str) -> str:
         return var.lower().replace("__", ".")
 
+    @staticmethod
+    def pointer_to_property(pointer: str) -> str:
+        """
+        converts a json pointer, as in "/servers/2/host", to a property, as in "servers.2.host",
+        list indexes are left as sub keys, the index resolves them either way
+        """
+        return ".".join(c.replace("~1", "/").replace("~0", "~").lower() for c in pointer.split(sep="/")[1:])
+
     @staticmethod
     def prop_and_var_from_key(key: str) -> Tuple[str, str]:
         prop = None
         var = None
-        if 0 == key.count("."):
+        if key.startswith("/"):
+            # json pointer
+            prop = ConfigurationUtils.pointer_to_property(key)
+            var = ConfigurationUtils.property_to_variable(prop)
+        elif 0 == key.count(".") and "[" not in key:
             # assume variable
             var = key.upper()
             prop = ConfigurationUtils.variable_to_property(var)
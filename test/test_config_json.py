@@ -1,11 +1,15 @@
+import json
 import os
 import sys
+from dataclasses import dataclass
+from typing import Optional
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
 import pytest
 
 from configlookup.main import Configuration
 from configlookup.overrider.abstract_overrider import AbstractOverrider
+from configlookup.reader import ConfigurationReader
 
 RESOURCES_DIR = f"{os.path.dirname(os.path.realpath(__file__))}/resources"
 JSON_FILE_1_SUFFIX = "_all"
@@ -15,6 +19,20 @@ JSON_FILES_SUFFIXES = [JSON_FILE_1_SUFFIX, JSON_FILE_2_SUFFIX]
 JSON_FILE_1 = f"{os.path.dirname(os.path.realpath(__file__))}/resources/configlookup_all.json"
 
 
+@dataclass(frozen=True)
+class ResourcesCfg:
+    mem: int
+    mem_min: float
+    color: str = "blue"
+    timeout: Optional[int] = None
+
+
+class ServerCfg:
+    __slots__ = ("url", "resources")
+    url: str
+    resources: ResourcesCfg
+
+
 class DummyOverrider(AbstractOverrider):
     def __init__(self, key: str, value: str):
         self.__key = key
@@ -186,6 +204,348 @@ def test_filter_key_multiple_sources(monkeypatch, instance):
     assert instance.get("OTHER__VAR8") == "BOG"
 
 
+def test_get_default(instance):
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    assert Configuration.get("SERVER_RESOURCES_MEMX", None) is None
+    assert Configuration.get("server.resources.memx", 1) == 1
+    assert Configuration.get("server.resources.mem", 1) == 2048
+
+
+def test_missing_keys_cache(instance):
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            instance.get("server.resources.timeout")
+    assert "server.resources.timeout" in instance._Configuration__state.missing
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+    assert instance.get("server.resources.timeout") == 6
+
+
+def test_missing_keys_cache_is_bounded(instance, monkeypatch):
+    monkeypatch.setattr(Configuration, "MISSING_KEYS_CACHE_SIZE", 2)
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    for key in ["a.x", "a.y", "a.z"]:
+        assert instance.get(key, None) is None
+    assert list(instance._Configuration__state.missing) == ["a.y", "a.z"]
+
+
+def test_missing_keys_cache_concurrent_eviction(instance, monkeypatch):
+    class ChangingDict(dict):
+        # as seen while another reader changes the cache
+        def __iter__(self):
+            raise RuntimeError("dictionary changed size during iteration")
+
+    monkeypatch.setattr(Configuration, "MISSING_KEYS_CACHE_SIZE", 1)
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    instance._Configuration__state.missing = ChangingDict({"a.x": None})
+    assert instance.get("a.y", None) is None
+    with pytest.raises(LookupError):
+        instance.get("a.z")
+
+
+def test_keys(instance):
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    assert Configuration.keys("server.resources") == Configuration.keys("SERVER__RESOURCES__")
+    assert Configuration.keys("server.resources") == [
+        "server.resources.color",
+        "server.resources.mem",
+        "server.resources.mem_min",
+    ]
+    assert Configuration.keys("*.mem_min") == ["rack.blade_lowspec.mem_min", "server.resources.mem_min"]
+    assert "SERVER__URL" not in Configuration.keys()
+
+
+def test_items(instance):
+    instance._Configuration__load(files=[JSON_FILE_1], files_path=RESOURCES_DIR)
+    instance._Configuration__overriders.append(DummyOverrider("SERVER__RESOURCES__MEM", "9192"))
+    assert Configuration.items("server.resources.mem*") == [
+        ("server.resources.mem", "9192"),
+        ("server.resources.mem_min", 1024),
+    ]
+
+
+def test_interpolation(instance, tmp_path):
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(
+        json.dumps({"common": {"host": "localhost", "api": {"url": "http://${host}/api"}}, "dev": {"host": "dev"}})
+    )
+    instance._Configuration__load(files_path=str(tmp_path))
+    assert instance.get("api.url") == instance.get("API__URL") == "http://dev/api"
+    assert instance.get("api") == {"url": "http://dev/api"}
+    instance._Configuration__overriders.append(DummyOverrider("HOST", "remote"))
+    assert instance.get("api.url") == "http://remote/api"
+    instance._Configuration__overriders.append(DummyOverrider("API__URL", "http://other/api"))
+    assert instance.get("api.url") == "http://other/api"
+
+
+def test_subscribe(instance, monkeypatch):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    server_changes, other_changes = [], []
+    Configuration.subscribe("server.resources", server_changes.append)
+    Configuration.subscribe("OTHER", other_changes.append)
+    try:
+        instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+        assert server_changes == [["server.resources.mem", "server.resources.timeout"]]
+        assert other_changes == [["other.var3", "other.var5", "other.var6", "other.var7", "other.var8"]]
+
+        Configuration.reload()
+        monkeypatch.setenv("SERVER__RESOURCES__COLOR", "brown")
+        Configuration.refresh()
+        assert server_changes[1:] == [["server.resources.color"]]
+        assert len(other_changes) == 1
+    finally:
+        Configuration.unsubscribe("server.resources", server_changes.append)
+        Configuration.unsubscribe("OTHER", other_changes.append)
+
+
+def test_apply_patch(instance, monkeypatch):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    monkeypatch.setenv("FEATURE__BETA", "on")
+    resources = instance.get("server.resources")
+    changes = []
+    Configuration.subscribe("server", changes.append)
+    try:
+        changed = Configuration.apply_patch({"server": {"resources": {"mem": 4096}}, "feature": {"beta": "off"}})
+    finally:
+        Configuration.unsubscribe("server", changes.append)
+    assert changed == ["feature", "feature.beta", "server.resources.mem"]
+    assert changes == [["server.resources.mem"]]
+    assert instance.get("server.resources.mem") == instance.get("server.resources")["mem"] == 4096
+    assert resources["mem"] == 2048
+    assert instance.get("feature.beta") == "on"
+    assert Configuration.keys("feature") == ["feature.beta"]
+    assert instance.get("server.url") == "http://www.site.com"
+
+
+def test_keys_flat_variables(instance, tmp_path):
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(json.dumps({"common": {"FEATURE__BETA": True, "FEATURE__GAMMA": "${FEATURE__BETA}"}}))
+    instance._Configuration__load(files_path=str(tmp_path))
+    assert Configuration.keys("FEATURE__") == Configuration.keys("feature") == ["feature.beta", "feature.gamma"]
+    assert Configuration.items("FEATURE__") == [("feature.beta", True), ("feature.gamma", True)]
+    assert Configuration.get("feature.beta") is Configuration.get("FEATURE__BETA") is True
+
+
+def test_view(instance, tmp_path, monkeypatch):
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "common": {"db": {"pool": {"size": 4}}, "server": {"url": "http://${host}", "mem": 1}},
+                "dev": {"host": "dev"},
+                "prod": {"host": "prod", "server": {"mem": 8}},
+                "test": {"host": "test"},
+            }
+        )
+    )
+    instance._Configuration__load(files_path=str(tmp_path), environment="dev")
+    config_file.unlink()
+    monkeypatch.setenv("SERVER__MEM", "2")
+
+    prod = Configuration.view("prod")
+    assert prod.get("server.url") == "http://prod"
+    assert prod.get("SERVER__MEM") == "2"
+    assert prod.get("server") == {"url": "http://prod", "mem": 8}
+    assert prod.get("nothing", None) is None
+    assert prod.keys("db") == ["db.pool", "db.pool.size"]
+    assert Configuration.view("test").items("server") == [("server.mem", "2"), ("server.url", "http://test")]
+    assert Configuration.get("server.url") == Configuration.view("dev").get("server.url") == "http://dev"
+
+    # cached and sharing the common subtrees
+    assert Configuration.view("prod").get("db") is prod.get("db") is Configuration.view("test").get("db")
+
+
+def test_view_not_supported(instance):
+    class DictReader(ConfigurationReader):
+        def read(self) -> dict:
+            return {"server": {"url": "http://www.site.com"}}
+
+    try:
+        instance._Configuration__load(reader=DictReader())
+        assert Configuration.get("server.url") == "http://www.site.com"
+        with pytest.raises(ValueError):
+            Configuration.view("prod")
+    finally:
+        instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+
+
+def test_handle(instance, monkeypatch):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    mem = Configuration.handle("server.resources.mem")
+    assert mem is Configuration.handle("server.resources.mem")
+    assert mem() == 2048
+
+    monkeypatch.setenv("SERVER__RESOURCES__MEM", "4096")
+    assert mem() == 2048
+    Configuration.refresh()
+    assert mem() == "4096"
+
+    monkeypatch.delenv("SERVER__RESOURCES__MEM")
+    Configuration.apply_patch({"server": {"resources": {"mem": 1024}}})
+    assert mem() == 1024
+
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+    assert mem() == 9192
+
+
+def test_handle_not_found(instance):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+    timeout = Configuration.handle("server.resources.timeout")
+    with pytest.raises(LookupError):
+        Configuration.handle("server.resources.nothing")
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    with pytest.raises(LookupError):
+        timeout()
+
+
+def test_bind(instance, monkeypatch):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    resources = Configuration.bind("server.resources", ResourcesCfg)
+    assert resources == ResourcesCfg(mem=2048, mem_min=1024.0, color="yellow", timeout=None)
+    assert isinstance(resources.mem_min, float)
+    assert resources == Configuration.bind("SERVER__RESOURCES", ResourcesCfg)
+    assert resources is Configuration.bind("server.resources", ResourcesCfg)
+
+    server = Configuration.bind("server", ServerCfg)
+    assert not hasattr(server, "__dict__")
+    assert server.url == "http://www.site.com"
+    assert server.resources.mem == 2048
+
+    # overrides come as text
+    monkeypatch.setenv("SERVER__RESOURCES__MEM", "4096")
+    Configuration.refresh()
+    assert Configuration.bind("server.resources", ResourcesCfg).mem == 4096
+
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+    monkeypatch.delenv("SERVER__RESOURCES__MEM")
+    Configuration.refresh()
+    assert Configuration.bind("server.resources", ResourcesCfg).mem == 9192
+
+
+def test_bind_errors(instance):
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    with pytest.raises(TypeError):
+        Configuration.bind("server.resources", dict)
+    Configuration.apply_patch({"server": {"resources": {"mem": "lots"}}})
+    try:
+        with pytest.raises(ValueError):
+            Configuration.bind("server.resources", ResourcesCfg)
+    finally:
+        # a patch is only dropped by loading again
+        instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+
+
+def test_hot_keys(instance, monkeypatch, tmp_path):
+    # restored after the test, so that no other test records keys
+    monkeypatch.setattr(instance, "_Configuration__hot_keys_file", None)
+    monkeypatch.setattr(instance, "_Configuration__accessed", None)
+    hot_keys_file = tmp_path / "hot_keys.json"
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "common": {"host": "localhost", "api": {"url": "http://${host}/api", "timeout": 5}, "db": {"size": 2}},
+                "dev": {"host": "dev", "price": "$${amount} USD", "ws": "${API__URL}/ws"},
+            }
+        )
+    )
+    with pytest.raises(ValueError):
+        Configuration.save_hot_keys()
+
+    Configuration.record_hot_keys(str(hot_keys_file))
+    instance._Configuration__load(files_path=str(tmp_path))
+    assert instance._Configuration__state.built
+    assert Configuration.get("api.url") == "http://dev/api"
+    assert Configuration.get("API__TIMEOUT") == 5
+    assert Configuration.get("api") == {"url": "http://dev/api", "timeout": 5}
+    assert Configuration.get("db") == {"size": 2}
+    assert Configuration.get("price") == "${amount} USD"
+    assert Configuration.save_hot_keys() == ["API__TIMEOUT", "api", "api.url", "db", "price"]
+    assert json.loads(hot_keys_file.read_text()) == ["API__TIMEOUT", "api", "api.url", "db", "price"]
+
+    instance._Configuration__load(files_path=str(tmp_path))
+    state = instance._Configuration__state
+    assert not state.built
+    # with their references resolved, from the values they reference only
+    assert state.hot == {"db": {"size": 2}, "api": {"url": "http://dev/api", "timeout": 5}}
+    assert Configuration.get("db") == {"size": 2}
+    monkeypatch.setenv("API__TIMEOUT", "10")
+    assert Configuration.get("API__TIMEOUT") == "10"
+    # escaped references are no references
+    assert Configuration.get("price") == "${amount} USD"
+    assert not state.built
+
+    # references to values are resolved as read, overrides included
+    monkeypatch.setenv("HOST", "remote")
+    assert Configuration.get("api.url") == "http://remote/api"
+    assert Configuration.get("api") == {"url": "http://dev/api", "timeout": 5}
+    assert Configuration.get("ws") == "http://remote/api/ws"
+    assert not state.built
+
+    # and the other keys on first use
+    assert Configuration.keys("api") == ["api.timeout", "api.url"]
+    assert state.built
+    # the configuration as read is left untouched
+    assert state.data["API__URL"] == "http://${host}/api"
+
+
+def test_hot_keys_references_not_in_data(instance, monkeypatch, tmp_path):
+    monkeypatch.setattr(instance, "_Configuration__hot_keys_file", str(tmp_path / "hot_keys.json"))
+    monkeypatch.setattr(instance, "_Configuration__accessed", None)
+    (tmp_path / "hot_keys.json").write_text(json.dumps(["first"]))
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(json.dumps({"common": {"hosts": ["a", "b"], "first": "${hosts[0]}", "loop": "${loop}"}}))
+    instance._Configuration__load(files_path=str(tmp_path))
+    # circular references are reported on first use, when rendering them from data is given up
+    with pytest.raises(ValueError):
+        Configuration.get("loop")
+
+    config_file.write_text(json.dumps({"common": {"hosts": ["a", "b"], "first": "${hosts[0]}"}}))
+    instance._Configuration__load(files_path=str(tmp_path))
+    state = instance._Configuration__state
+    assert not state.built
+    # list elements are only found in the index
+    assert Configuration.get("first") == "a"
+    assert state.built
+
+
+def test_list_elements(instance, tmp_path):
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(
+        json.dumps({"common": {"servers": [{"host": "a", "port": 80}, {"host": "b", "port": 81}], "tags": ["x"]}})
+    )
+    instance._Configuration__load(files_path=str(tmp_path))
+    assert Configuration.get("servers[1].host") == Configuration.get("SERVERS__1__HOST") == "b"
+    assert Configuration.get("/servers/0/port") == 80
+    assert Configuration.get("tags[0]") == "x"
+    assert Configuration.get("servers[2].host", None) is None
+    assert Configuration.items("servers[*].host") == [("servers[0].host", "a"), ("servers[1].host", "b")]
+
+
+def test_register_overrider(instance, monkeypatch):
+    # restored after the test, so that the overrider is gone on the next load
+    monkeypatch.setattr(instance, "_Configuration__registered", [])
+    instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=[JSON_FILE_1_SUFFIX])
+    changes = []
+    Configuration.subscribe("server", changes.append)
+    try:
+        mem = Configuration.handle("server.resources.mem")
+        Configuration.register_overrider(DummyOverrider("SERVER__RESOURCES__MEM", "4096"))
+        assert Configuration.get("server.resources.mem") == mem() == "4096"
+        assert changes == [["server.resources.mem"]]
+
+        # the environment overrider still takes precedence
+        monkeypatch.setenv("SERVER__RESOURCES__MEM", "8192")
+        assert Configuration.get("server.resources.mem") == "8192"
+        monkeypatch.delenv("SERVER__RESOURCES__MEM")
+
+        # kept across loads
+        instance._Configuration__load(files_path=RESOURCES_DIR, files_additional_suffixes=JSON_FILES_SUFFIXES)
+        assert Configuration.get("server.resources.mem") == "4096"
+    finally:
+        Configuration.unsubscribe("server", changes.append)
+
+
 def test_dummy_to_reset_configuration_singleton(monkeypatch, instance):
     # we need to keep this test here to reset the configuration data, after doing tests on it
     instance._Configuration__load()
@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
+import pytest
+
+from configlookup.main import Configuration
+from configlookup.reader import HttpConfigurationReader
+
+DOCUMENTS = {
+    "/all.json": {"common": {"server": {"url": "http://www.site.com", "mem": 1024}}, "dev": {"name": "myname"}},
+    "/local.json": {"dev": {"server": {"mem": 2048}}},
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address, self.headers.get("If-None-Match")))
+        document = self.server.documents.get(self.path)
+        if document is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{hash(json.dumps(document, sort_keys=True))}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.documents = json.loads(json.dumps(DOCUMENTS))
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_read(server):
+    reader = HttpConfigurationReader([url(server, "/all.json"), url(server, "/local.json")], None, ["common", "dev"])
+    data = reader.read()
+    reader.close()
+    assert data["server"] == {"url": "http://www.site.com", "mem": 2048}
+    assert data["NAME"] == "myname"
+
+
+def test_read_not_modified(server):
+    reader = HttpConfigurationReader(url(server, "/all.json"), None, ["common", "dev"])
+    first = reader.read()
+    assert reader.read() is first
+    server.documents["/all.json"]["dev"]["name"] = "othername"
+    second = reader.read()
+    reader.close()
+    assert second is not first
+    assert second["NAME"] == "othername"
+    assert [r[2] is not None for r in server.requests] == [False, True, True]
+    # one connection reused all along
+    assert 1 == len({r[1] for r in server.requests})
+
+
+def test_read_not_found(server):
+    reader = HttpConfigurationReader(url(server, "/none.json"), None, [])
+    with pytest.raises(ConnectionError):
+        reader.read()
+    reader.close()
+
+
+def test_configuration_reader(server, monkeypatch):
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources"))
+    instance = Configuration()
+    reader = HttpConfigurationReader([url(server, "/all.json"), url(server, "/local.json")], None, ["common", "dev"])
+    instance._Configuration__load(reader=reader)
+    changes = []
+    Configuration.subscribe("", changes.append)
+    try:
+        assert Configuration.get("server.mem") == 2048
+        Configuration.reload()
+        assert changes == []
+        server.documents["/local.json"]["dev"]["server"]["mem"] = 4096
+        Configuration.reload()
+        assert changes == [["server.mem"]]
+        assert Configuration.get("SERVER__MEM") == 4096
+    finally:
+        Configuration.unsubscribe("", changes.append)
+        reader.close()
+        instance._Configuration__load()
+
+
+def test_read_documents(server):
+    reader = HttpConfigurationReader([url(server, "/all.json"), url(server, "/local.json")], None, ["common", "dev"])
+    first = reader.read()
+    server.documents["/local.json"]["dev"]["server"]["mem"] = 4096
+    documents = reader.read_documents()
+    assert documents[1] == {"dev": {"server": {"mem": 4096}}}
+    # modified while reading documents, so merged again
+    second = reader.read()
+    reader.close()
+    assert second is not first
+    assert second["SERVER__MEM"] == 4096
+
+
+def test_configuration_reader_patched_reload(server, monkeypatch):
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources"))
+    instance = Configuration()
+    server.documents["/api.json"] = {"common": {"host": "a", "api": {"url": "http://${host}/api"}}}
+    reader = HttpConfigurationReader(url(server, "/api.json"), None, ["common", "dev"])
+    try:
+        instance._Configuration__load(reader=reader)
+        Configuration.apply_patch({"host": "b"})
+        assert Configuration.get("api.url") == "http://b/api"
+        # not modified, but the patch is dropped as in any other reload
+        Configuration.reload()
+        assert server.requests[-1][2] is not None
+        assert Configuration.get("api.url") == "http://a/api"
+        monkeypatch.setenv("HOST", "z")
+        assert Configuration.get("api.url") == "http://z/api"
+        # what the reader keeps is left as read
+        assert reader.read()["api"]["url"] == "http://${host}/api"
+    finally:
+        reader.close()
+        instance._Configuration__load()
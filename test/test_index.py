@@ -0,0 +1,164 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
+import pytest
+
+from configlookup.index import ConfigurationIndex
+from configlookup.utils import ConfigurationUtils
+
+
+def test_index_properties():
+    data = {}
+    ConfigurationUtils.merge_dict({"server": {"resources": {"mem": 2048}}, "name": "zenao", "tags": ["a"]}, data)
+    index = ConfigurationIndex(data)
+    assert sorted(index) == ["name", "server", "server.resources", "server.resources.mem", "tags", "tags[0]"]
+    assert index["server.resources.mem"] == 2048
+    assert index["server.resources"] == {"mem": 2048}
+
+
+def test_index_upper_case_root_key():
+    data = {}
+    ConfigurationUtils.merge_dict({"OTHER": {"var1": "GOLD"}}, data)
+    index = ConfigurationIndex(data)
+    assert "other.var1" in index
+    assert "other__var1" not in index
+
+
+def test_index_flat_variable_root_key():
+    data = {}
+    ConfigurationUtils.merge_dict({"FEATURE__BETA": True, "FEATURE__ALPHA": False, "server": {"url": "u"}}, data)
+    index = ConfigurationIndex(data)
+    assert index.find("feature.beta") == "feature.beta"
+    assert "feature__beta" not in index
+    assert index.keys("feature") == ["feature.alpha", "feature.beta"]
+    patched, changed = index.patched({"FEATURE__BETA": False, "FEATURE__GAMMA": 1})
+    assert sorted(changed) == ["feature.beta", "feature.gamma"]
+    assert patched.keys("feature") == ["feature.alpha", "feature.beta", "feature.gamma"]
+    assert patched["feature.beta"] is False
+
+
+def test_index_find():
+    data = {}
+    ConfigurationUtils.merge_dict({"server": {"resources": {"mem": 2048}}, "name_prefix": "mr"}, data)
+    index = ConfigurationIndex(data)
+    assert index.find("server.resources.mem") == "server.resources.mem"
+    assert index.find("server.name_prefix") == "name_prefix"
+    assert index.find("server.name_prefix.cpu") is None
+    assert index.find("server.resources.cpu") is None
+
+
+def test_index_keys():
+    data = {}
+    ConfigurationUtils.merge_dict(
+        {"server": {"url": "u", "resources": {"mem": 1, "mem_min": 0}, "resources_x": 2}, "serverx": 3}, data
+    )
+    index = ConfigurationIndex(data)
+    assert index.keys("server.resources") == ["server.resources.mem", "server.resources.mem_min"]
+    assert index.keys("server.resources.") == ["server.resources.mem", "server.resources.mem_min"]
+    assert index.keys("server.url") == []
+    assert index.keys("nothing") == []
+    assert len(index.keys()) == len(index)
+
+
+def test_index_keys_glob():
+    data = {}
+    ConfigurationUtils.merge_dict({"server": {"url": "u", "resources": {"url": 1, "mem": 0}}, "url": 3}, data)
+    index = ConfigurationIndex(data)
+    assert index.keys("server.*url") == ["server.resources.url", "server.url"]
+    assert index.keys("*.url") == ["server.resources.url", "server.url"]
+    assert index.keys("server.???") == ["server.url"]
+
+
+def test_index_diff():
+    old, new = {}, {}
+    ConfigurationUtils.merge_dict({"server": {"url": "u", "mem": 1}, "name": "a", "tags": ["x"]}, old)
+    ConfigurationUtils.merge_dict({"server": {"url": "v", "mem": 1}, "name": "a", "id": 1}, new)
+    assert ConfigurationIndex(new).diff(ConfigurationIndex(old)) == ["id", "server.url", "tags"]
+
+
+def test_index_patched():
+    data = {}
+    ConfigurationUtils.merge_dict(
+        {"server": {"url": "u", "resources": {"mem": 1}, "pools": {"size": 2}}, "name": "a", "tags": ["x"]}, data
+    )
+    index = ConfigurationIndex(data)
+    patched, changed = index.patched(
+        {"server": {"resources": {"mem": 2, "cpu": 4}, "url": "u"}, "tags": ["y"], "feature": {"beta": True}}
+    )
+    assert sorted(changed) == [
+        "feature",
+        "feature.beta",
+        "server.resources.cpu",
+        "server.resources.mem",
+        "tags",
+        "tags[1]",
+    ]
+    # the original is untouched
+    assert data["server"]["resources"] == {"mem": 1} and data["SERVER__RESOURCES__MEM"] == 1
+    assert sorted(data["tags"]) == ["x"] and "feature" not in index
+    # the patched one shares whatever wasn't patched
+    assert patched.data["server"]["resources"] == {"mem": 2, "cpu": 4} and patched.data["SERVER__RESOURCES__MEM"] == 2
+    assert patched.data["server"]["pools"] is data["server"]["pools"]
+    assert patched["server.resources"] is patched.data["server"]["resources"]
+    assert sorted(patched["tags"]) == ["x", "y"]
+    assert patched.keys("feature") == ["feature.beta"]
+    assert patched.diff(index) == ["feature", "server.resources.cpu", "server.resources.mem", "tags"]
+
+
+@pytest.mark.parametrize("patch", [{"server": "flat"}, {"server": {"pools": None}}, {"tags": "x"}])
+def test_index_patched_section_to_value(patch):
+    data = {}
+    ConfigurationUtils.merge_dict({"server": {"url": "u", "pools": [{"host": "a"}]}, "tags": ["x"]}, data)
+    index = ConfigurationIndex(data)
+    with pytest.raises(TypeError):
+        index.patched(patch)
+    assert index.keys("server") == ["server.pools", "server.pools[0]", "server.pools[0].host", "server.url"]
+
+
+def test_index_list_elements():
+    data = {}
+    ConfigurationUtils.merge_dict(
+        {"servers": [{"host": "a", "ports": [80, 443]}, {"host": "b"}], "endpoints": [{"url": "u"}]}, data
+    )
+    index = ConfigurationIndex(data)
+    assert index["servers[1].host"] == "b"
+    assert index["servers[0].ports[1]"] == 443
+    assert index.find("servers.0.ports.1") == "servers[0].ports[1]"
+    assert index.find("endpoints.0.url") == "endpoints[0].url"
+    assert index.find("servers[2].host") is None
+    assert index.keys("servers[0]") == [
+        "servers[0].host",
+        "servers[0].ports",
+        "servers[0].ports[0]",
+        "servers[0].ports[1]",
+    ]
+    assert index.keys("servers.1") == ["servers[1].host"]
+    assert index.keys("servers[*].host") == ["servers[0].host", "servers[1].host"]
+    assert index.within_list("servers[0].host") and not index.within_list("servers")
+
+    patched, changed = index.patched({"servers": [{"host": "c"}]})
+    assert changed == ["servers", "servers[2]", "servers[2].host"]
+    assert patched.find("servers.2.host") == "servers[2].host"
+    assert "servers[2]" not in index
+
+
+def test_index_patched_layers():
+    data = {}
+    ConfigurationUtils.merge_dict({"server": {"url": "u", "pools": {"size": 2}}, "tags": ["x"]}, data)
+    index = ConfigurationIndex(data)
+    expected = set(index)
+    for i in range(200):
+        index, changed = index.patched({"server": {f"k{i:03}": i, "url": f"u{i}"}, "tags": [f"t{i}"]})
+        expected.update([f"server.k{i:03}", f"tags[{i + 1}]"])
+        assert sorted(changed) == [f"server.k{i:03}", "server.url", "tags", f"tags[{i + 1}]"]
+    # patches are layered, with logarithmically many layers
+    assert len(index._ConfigurationIndex__sorted) <= 9
+    assert sorted(index) == index.keys() == sorted(expected)
+    assert index.keys("server.k19?") == [f"server.k{i}" for i in range(190, 200)]
+    assert index["server.k100"] == index.data["SERVER__K100"] == 100
+    assert index["server.url"] == index.data["SERVER__URL"] == "u199"
+    assert index.find("tags.200") == "tags[200]" and index["tags[200]"] == "t199"
+    # the original is untouched
+    assert data["server"] == {"url": "u", "pools": {"size": 2}} and data["tags"] == ["x"]
+    assert index.data["server"]["pools"] is data["server"]["pools"]
@@ -0,0 +1,137 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
+import pytest
+
+from configlookup.index import ConfigurationIndex
+from configlookup.interpolation import ConfigurationInterpolator
+from configlookup.utils import ConfigurationUtils
+
+
+def interpolate(source):
+    data = {}
+    ConfigurationUtils.merge_dict(source, data)
+    index = ConfigurationIndex(data)
+    return data, index, ConfigurationInterpolator(data, index)
+
+
+def test_interpolation():
+    data, index, _ = interpolate(
+        {
+            "api": {"url": "${base_url}/api", "v2": "${API__URL}/v2"},
+            "base_url": "http://${host}:${port}",
+            "host": "localhost",
+            "port": 8080,
+        }
+    )
+    assert data["base_url"] == data["BASE_URL"] == index["base_url"] == "http://localhost:8080"
+    assert data["api"]["url"] == data["API__URL"] == index["api.url"] == "http://localhost:8080/api"
+    assert data["api"]["v2"] == "http://localhost:8080/api/v2"
+
+
+def test_interpolation_single_reference_keeps_type():
+    data, _, _ = interpolate({"port": 8080, "server": {"port": "${port}"}, "text": "$${port}"})
+    assert data["server"]["port"] == 8080
+    assert data["text"] == "${port}"
+
+
+def test_interpolation_unknown_reference():
+    with pytest.raises(ValueError):
+        interpolate({"url": "${host}/api"})
+
+
+def test_interpolation_cycle():
+    with pytest.raises(ValueError) as x:
+        interpolate({"a": "${b}", "b": "${c}", "c": "x${a}"})
+    assert "circular reference" in str(x.value)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [{"a": {"b": "${a}"}}, {"x": {"y": "pre-${x}"}}, {"x": {"y": "${X__Y}"}}, {"l": [1], "x": {"y": {"z": "${x.y}"}}}],
+)
+def test_interpolation_cycle_enclosing_section(source):
+    with pytest.raises(ValueError) as x:
+        interpolate(source)
+    assert "circular reference" in str(x.value)
+
+
+@pytest.mark.parametrize("template", ["${server}", "url: ${server}", "${tags}"])
+def test_interpolation_section_reference(template):
+    with pytest.raises(ValueError) as x:
+        interpolate({"server": {"url": "u"}, "tags": ["a"], "whole": template})
+    assert "references a section" in str(x.value)
+
+
+def test_interpolation_overrides():
+    _, _, interpolator = interpolate({"url": "http://${host}/api", "host": "localhost"})
+    calls = []
+
+    def overridden(var):
+        calls.append(var)
+        return {"HOST": "remote"}.get(var)
+
+    assert interpolator.value("url", lambda var: None) == "http://localhost/api"
+    assert interpolator.value("url", overridden) == "http://remote/api"
+    assert interpolator.value("url", overridden) == "http://remote/api"
+    assert calls == ["HOST", "HOST", "HOST"]
+
+
+def count_renders(monkeypatch):
+    renders = []
+    render = ConfigurationInterpolator._ConfigurationInterpolator__render
+
+    def counting(self, prop, overridden, rendered):
+        renders.append(prop)
+        return render(self, prop, overridden, rendered)
+
+    monkeypatch.setattr(ConfigurationInterpolator, "_ConfigurationInterpolator__render", counting)
+    return renders
+
+
+def test_interpolation_renders_once(monkeypatch):
+    renders = count_renders(monkeypatch)
+    # a chain longer than the recursion limit
+    chain = {f"a{i}": f"${{a{i - 1}}}" for i in range(1, 1500)}
+    chain["a0"] = "x"
+    data, _, interpolator = interpolate(chain)
+    assert data["a1499"] == "x"
+    assert len(renders) == 1499
+
+    renders.clear()
+    assert interpolator.value("a1499", {"A0": "y"}.get) == "y"
+    assert len(renders) == 1499
+
+    renders.clear()
+    diamond = {"a0": "a", "b0": "b"}
+    for i in range(1, 41):
+        diamond[f"a{i}"] = f"${{a{i - 1}}}${{b{i - 1}}}"
+        diamond[f"b{i}"] = f"${{b{i - 1}}}"
+    data, _, interpolator = interpolate(diamond)
+    assert data["a40"] == "a" + "b" * 40
+    assert len(renders) == 80
+
+    renders.clear()
+    assert interpolator.value("a40", {"B0": "c"}.get) == "a" + "c" * 40
+    # b40 is not a dependency
+    assert len(renders) == 79
+
+
+def test_interpolation_patched():
+    data, index, interpolator = interpolate(
+        {"base": "http://${host}", "api": {"url": "${base}/api"}, "other": "${name}", "host": "a", "name": "n"}
+    )
+    patched_index, changed = index.patched({"host": "b"})
+    patched, resolved = interpolator.patched(patched_index, changed)
+    assert resolved == ["base", "api.url"]
+    assert patched_index.data["api"]["url"] == patched_index.data["API__URL"] == "http://b/api"
+    assert data["api"]["url"] == "http://a/api"
+
+    patched_index, changed = patched_index.patched({"name": "${api.url}"})
+    _, resolved = patched.patched(patched_index, changed)
+    assert resolved == ["name", "other"]
+    assert patched_index.data["other"] == "http://b/api"
+
+    with pytest.raises(ValueError):
+        patched.patched(*patched_index.patched({"host": "${api.url}"}))
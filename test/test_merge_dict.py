@@ -2,6 +2,8 @@ import os
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
+from configlookup.index import ConfigurationIndex
+from configlookup.reader import ConfigurationReader
 from configlookup.utils import ConfigurationUtils
 
 
@@ -69,3 +71,110 @@ def test_find_config():
     assert d == ConfigurationUtils.find_property("VAR1_BIG_PSWD", d)["pointer"]
     c = ConfigurationUtils.find_property("VAR1_BIG_PSWD", d)
     assert "1234" == c["pointer"][c["key"]]
+
+
+def test_diff():
+    shared = {"pool": {"size": 1}}
+    old = {"a": {"b": 1, "c": [1, 2]}, "d": shared, "e": {"f": 1}}
+    new = {"a": {"b": 2, "c": [1, 2], "g": "x"}, "d": shared, "h": 1}
+    assert sorted(ConfigurationUtils.diff(old, new, "root")) == ["root.a.b", "root.a.g", "root.e", "root.h"]
+    assert ConfigurationUtils.diff(old, dict(old), "root") == []
+    assert ConfigurationUtils.diff(1, True, "root") == ["root"]
+
+
+def test_diff_compares_leaves_once():
+    compared = []
+
+    class Leaf(int):
+        def __eq__(self, other):
+            compared.append(int(self))
+            return int.__eq__(self, other)
+
+        __hash__ = int.__hash__
+
+    def tree(depth):
+        return {"x": Leaf(depth), "y": Leaf(depth)} if depth == 0 else {"x": tree(depth - 1), "y": tree(depth - 1)}
+
+    old, new = tree(6), tree(6)
+    leaf = new
+    for _ in range(6):
+        leaf = leaf["y"]
+    leaf["y"] = Leaf(1)
+    assert ConfigurationUtils.diff(old, new, "root") == ["root" + ".y" * 7]
+    assert len(compared) == 2**7
+
+
+def make_tree(root):
+    for path in ["b.json", "a.json", "sub/c.json", "sub/notes.txt", "legacy/d.json"]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("{}")
+
+
+def test_scan_dir(tmp_path):
+    make_tree(tmp_path)
+    found = ConfigurationUtils.scan_dir(str(tmp_path), include=["*.json"], exclude=["legacy/*"])
+    assert [os.path.relpath(f, tmp_path) for f in found] == ["a.json", "b.json", os.path.join("sub", "c.json")]
+    assert 5 == len(ConfigurationUtils.scan_dir(str(tmp_path)))
+
+
+def test_scan_dir_manifest(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+
+    first = ConfigurationUtils.scan_dir(str(tmp_path), include=["*.json"], use_manifest=True)
+    assert 3 == len(scans)
+    assert ConfigurationUtils.scan_dir(str(tmp_path), include=["*.json"], use_manifest=True) == first
+    assert 3 == len(scans)
+
+    (tmp_path / "sub" / "e.json").write_text("{}")
+    os.utime(tmp_path / "sub", ns=(0, 0))
+    assert len(ConfigurationUtils.scan_dir(str(tmp_path), include=["*.json"], use_manifest=True)) == 5
+    assert 6 == len(scans)
+
+
+def test_unique():
+    assert ConfigurationUtils.unique(["b", "a", "b", {"x": 1}, {"x": 1}, [1], [1], "a"]) == ["b", "a", {"x": 1}, [1]]
+
+
+def test_merge_dict_lists_of_objects():
+    d = {}
+    ConfigurationUtils.merge_dict({"servers": [{"host": "a"}, {"host": "b"}]}, d)
+    ConfigurationUtils.merge_dict({"servers": [{"host": "b"}, {"host": "c"}]}, d)
+    assert d["servers"] == [{"host": "a"}, {"host": "b"}, {"host": "c"}]
+
+
+def test_merge_documents_nested_lists():
+    documents = [
+        {"common": {"server": {"pools": [{"host": "a"}, {"host": "b"}]}}, "dev": {"server": {"tags": ["x"]}}},
+        {"dev": {"server": {"pools": [{"host": "b"}, {"host": "c"}], "tags": ["x", "y"]}}},
+    ]
+    data = ConfigurationReader.merge_documents(documents, ["common", "dev"])
+    assert data["server"]["pools"] == data["SERVER__POOLS"] == [{"host": "a"}, {"host": "b"}, {"host": "c"}]
+    assert data["server"]["tags"] == data["SERVER__TAGS"] == ["x", "y"]
+    assert documents[0]["common"]["server"]["pools"] == [{"host": "a"}, {"host": "b"}]
+    index = ConfigurationIndex(data)
+    assert index.keys("server.pools") == [
+        "server.pools[0]",
+        "server.pools[0].host",
+        "server.pools[1]",
+        "server.pools[1].host",
+        "server.pools[2]",
+        "server.pools[2].host",
+    ]
+
+
+def test_find_property_in_lists():
+    d = {"servers": [{"host": "a"}, {"host": "b", "ports": [80]}]}
+    assert ConfigurationUtils.find_property("servers[1].ports[0]", d) == {"pointer": [80], "key": 0}
+    assert ConfigurationUtils.find_property("servers.1.host", d)["pointer"] is d["servers"][1]
+    assert ConfigurationUtils.find_property("servers[2].host", d) is None
+
+
+def test_prop_and_var_from_key_with_indexes():
+    assert ConfigurationUtils.prop_and_var_from_key("servers[2].host") == ("servers[2].host", "SERVERS__2__HOST")
+    assert ConfigurationUtils.prop_and_var_from_key("tags[0]") == ("tags[0]", "TAGS__0")
+    assert ConfigurationUtils.prop_and_var_from_key("ENDPOINTS__0__URL") == ("endpoints.0.url", "ENDPOINTS__0__URL")
+    assert ConfigurationUtils.prop_and_var_from_key("/servers/2/host") == ("servers.2.host", "SERVERS__2__HOST")
+    assert ConfigurationUtils.prop_and_var_from_key("/a~1b/c~0d") == ("a/b.c~d", "A/B__C~D")
@@ -0,0 +1,64 @@
+import os
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")))
+from configlookup.overrider.abstract_overrider import AbstractOverrider
+from configlookup.overrider.dict_overrider import DictOverrider
+from configlookup.overrider.overrider_chain import OverriderChain
+
+
+class CountingOverrider(AbstractOverrider):
+    def __init__(self, values, prefixes: Optional[List[str]] = None):
+        self.values = values
+        self.__prefixes = prefixes
+        self.asked: List[str] = []
+
+    def get(self, key: str) -> str:
+        self.asked.append(key)
+        return self.values.get(key)
+
+    def prefixes(self) -> Optional[List[str]]:
+        return self.__prefixes
+
+
+def test_chain_precedence():
+    low, high = CountingOverrider({"A": "low", "B": "low"}), CountingOverrider({"A": "high"})
+    chain = OverriderChain([low, high])
+    assert chain.get("A") == "high"
+    # stops at the first value found
+    assert low.asked == []
+    assert chain.get("B") == "low"
+    assert chain.get("C") is None
+    assert high.asked == ["A", "B", "C"] and low.asked == ["B", "C"]
+
+
+def test_chain_scopes():
+    unscoped = CountingOverrider({"SERVER__URL": "x"})
+    scoped = CountingOverrider({"SERVER__URL": "y"}, prefixes=["DB__"])
+    chain = OverriderChain([unscoped, DictOverrider({"NAME": "n"}), scoped])
+    assert chain.get("SERVER__URL") == "x"
+    assert chain.get("NAME") == "n"
+    assert scoped.asked == []
+    assert chain.get("DB__SIZE") is None
+    assert scoped.asked == ["DB__SIZE"]
+
+
+def test_chain_changes():
+    chain = OverriderChain([DictOverrider({"A": "1"})])
+    assert chain.get("A") == "1"
+    chain.append(DictOverrider({"A": "2"}))
+    assert chain.get("A") == "2"
+    chain.insert(0, DictOverrider({"A": "0"}))
+    assert chain.get("A") == "2"
+    del chain[-1]
+    assert chain.get("A") == "1"
+    chain[1] = DictOverrider({"B": "1"})
+    assert chain.get("A") == "0"
+
+    overrider = CountingOverrider({"A": "3"}, prefixes=["B"])
+    chain.append(overrider)
+    assert chain.get("A") == "0"
+    overrider._CountingOverrider__prefixes = None
+    chain.invalidate()
+    assert chain.get("A") == "3"
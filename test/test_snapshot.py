@@ -0,0 +1,83 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+sys.path.insert(0, SRC_DIR)
+import pytest
+
+from configlookup.main import Configuration
+
+RESOURCES_DIR = f"{os.path.dirname(os.path.realpath(__file__))}/resources"
+
+
+def worker(key):
+    return Configuration.get(key)
+
+
+@pytest.fixture
+def instance(monkeypatch, tmp_path):
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", RESOURCES_DIR)
+    monkeypatch.setenv("SERVER__RESOURCES__MEM", "9192")
+    config_file = tmp_path / "configlookup.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "common": {"host": "localhost", "server": {"url": "http://${host}/api", "mem": 1}},
+                "dev": {"server": {"resources": {"mem": 2048}}},
+            }
+        )
+    )
+    instance = Configuration()
+    instance._Configuration__load(files_path=str(tmp_path))
+    yield instance
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", RESOURCES_DIR)
+    instance._Configuration__load()
+
+
+def test_snapshot(instance, monkeypatch):
+    snapshot = Configuration.export_snapshot()
+    monkeypatch.delenv("SERVER__RESOURCES__MEM")
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", "/not/a/dir")
+    Configuration.import_snapshot(snapshot)
+    assert Configuration.get("server.resources.mem") == "9192"
+    assert Configuration.get("server.url") == "http://localhost/api"
+    monkeypatch.setenv("HOST", "remote")
+    assert Configuration.get("server.url") == "http://remote/api"
+
+
+def test_snapshot_not_a_snapshot(instance):
+    with pytest.raises(ValueError):
+        Configuration.import_snapshot(b"\x80\x04K\x01.")
+
+
+def test_snapshot_pool_initializer(instance, monkeypatch):
+    snapshot = Configuration.export_snapshot()
+    # children can't read any config file
+    monkeypatch.setenv("CONFIGLOOKUP_DIR", "/not/a/dir")
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(2, initializer=Configuration.import_snapshot, initargs=(snapshot,)) as pool:
+        assert pool.map(worker, ["server.resources.mem", "SERVER__URL"]) == ["9192", "http://localhost/api"]
+
+
+def test_snapshot_inherited_fd(instance):
+    with tempfile.TemporaryFile() as file:
+        file.write(Configuration.export_snapshot())
+        file.flush()
+        env = dict(os.environ)
+        env.update(
+            {"CONFIGLOOKUP_DIR": "/not/a/dir", "CONFIGLOOKUP_SNAPSHOT_FD": str(file.fileno()), "PYTHONPATH": SRC_DIR}
+        )
+        script = "from configlookup.main import Configuration; print(Configuration.get('SERVER__URL'))"
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            env=env,
+            pass_fds=(file.fileno(),),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    assert output.strip() == "http://localhost/api"